@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import { renderToSVG, renderToImage, LayoutData, RegionContentsMap, RenderOptions } from '../services/ArtworkRenderer';
+import { renderToSVG, LayoutData, RegionContentsMap, RenderOptions } from '../services/ArtworkRenderer';
+import renderCache from '../services/renderCache';
 
 interface InlineArtworkPreviewProps {
   layoutData: LayoutData | null;
@@ -33,7 +34,8 @@ const InlineArtworkPreview: React.FC<InlineArtworkPreviewProps> = ({
     }
 
     try {
-      const dataUrl = await renderToImage(layoutData, regionContents, { ...options, onlyPreview: true });
+      // Cached by layout, variable values and renderer version; repeat orders skip the render
+      const dataUrl = await renderCache.getImage(layoutData, regionContents, { ...options, onlyPreview: true });
       setImageData(dataUrl);
       setError(null);
     } catch (err) {
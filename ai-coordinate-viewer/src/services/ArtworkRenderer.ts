@@ -27,6 +27,9 @@ export interface RenderOptions {
   headerText?: string;
 }
 
+// Bump whenever a change alters the rendered output, so cached renders are not reused
+export const RENDERER_VERSION = '1';
+
 const DEFAULT_OPTS: RenderOptions = {
   onlyPreview: true,
   showDimensions: false,
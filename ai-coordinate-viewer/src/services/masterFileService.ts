@@ -14,6 +14,30 @@ import { mockDatabase } from '../database/mockDatabase';
 
 class MasterFileService {
   private baseUrl = 'http://localhost:3001/api'; // Backend API URL
+  // The list endpoint returns metadata only; payloads come from /master-files/:id
+  // and are reused until the master file's updatedAt changes
+  private payloadCache = new Map<string, { updatedAt: string; payload: Promise<any> }>();
+
+  private loadPayload(id: string, updatedAt: string): Promise<any> {
+    const cached = this.payloadCache.get(id);
+    if (cached && cached.updatedAt === updatedAt) {
+      return cached.payload;
+    }
+    const payload = fetch(`${this.baseUrl}/master-files/${id}`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(result => result?.masterFile ?? null)
+      .catch(error => {
+        console.warn(`⚠️ Failed to load master file ${id}:`, error);
+        return null;
+      });
+    const entry = { updatedAt, payload };
+    // Don't keep failed loads; the next listing retries them
+    payload.then(mf => {
+      if (!mf && this.payloadCache.get(id) === entry) this.payloadCache.delete(id);
+    });
+    this.payloadCache.set(id, entry);
+    return payload;
+  }
 
   // =====================================================
   // CREATE MASTER FILE
@@ -88,9 +112,17 @@ class MasterFileService {
         if (response.ok) {
           const result = await response.json();
           // Transform backend data to match frontend interface
-          const masterFiles = result.masterFiles.map((mf: any) => {
+          const listedIds = new Set(result.masterFiles.map((mf: any) => mf.id));
+          Array.from(this.payloadCache.keys())
+            .filter(id => !listedIds.has(id))
+            .forEach(id => this.payloadCache.delete(id));
+          const payloads = await Promise.all(
+            result.masterFiles.map((mf: any) => this.loadPayload(mf.id, mf.updatedAt))
+          );
+          const masterFiles = result.masterFiles.map((mf: any, index: number) => {
+            const full = payloads[index];
             let parsed: any = null;
-            try { parsed = mf.data ? JSON.parse(mf.data) : null; } catch {}
+            try { parsed = full?.data ? JSON.parse(full.data) : null; } catch {}
             const metaCustomerName = parsed?.designData?.metadata?.customerName;
             return {
               id: mf.id,
@@ -99,7 +131,7 @@ class MasterFileService {
               width: mf.width || 200,
               height: mf.height || 150,
               customerId: mf.customerId || 'default',
-              canvasImage: mf.canvasImage,
+              canvasImage: full?.canvasImage ?? null,
               designData: parsed?.designData ?? null,
               revisionNumber: 1,
               revisionHistory: [],
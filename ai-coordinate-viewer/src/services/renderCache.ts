@@ -0,0 +1,319 @@
+// Render Cache - Persistent cache for rendered label artwork
+// In-memory LRU in front of an IndexedDB store (kept on disk by the browser). Sizes and
+// access times live in a small metadata store, so totals and eviction never read payloads.
+// Keyed by the layout's content hash, the variable values (regionContents), the render
+// options and RENDERER_VERSION, so a repeat order reuses the earlier render.
+
+import {
+  renderToSVG,
+  renderToImage,
+  LayoutData,
+  RegionContentsMap,
+  RenderOptions,
+  RENDERER_VERSION
+} from './ArtworkRenderer';
+
+type RenderKind = 'svg' | 'png';
+
+interface CacheEntryMeta {
+  key: string;
+  kind: RenderKind;
+  size: number;
+  createdAt: number;
+  lastAccess: number;
+}
+
+export interface RenderCacheStats {
+  memoryHits: number;
+  diskHits: number;
+  misses: number;
+  evictions: number;
+  memoryEntries: number;
+  memoryBytes: number;
+  diskEntries: number;
+  diskBytes: number;
+  hitRate: number;
+}
+
+const DB_NAME = 'care_label_render_cache';
+const DB_VERSION = 2;
+const META_STORE = 'entries';
+const PAYLOAD_STORE = 'payloads';
+// Version 1 kept payloads and metadata together
+const LEGACY_STORE = 'renders';
+const DEFAULT_MEMORY_MAX_BYTES = 16 * 1024 * 1024;
+const DEFAULT_DISK_MAX_BYTES = 200 * 1024 * 1024;
+// Disk eviction trims down to this share of the limit so it doesn't run on every write
+const DISK_EVICTION_TARGET = 0.9;
+// Disk hits refresh lastAccess at most this often (ms)
+const ACCESS_UPDATE_INTERVAL = 60 * 1000;
+
+// JSON with sorted object keys, so equal data always hashes the same
+function stableStringify(value: any): string {
+  if (value === null || typeof value !== 'object') {
+    return JSON.stringify(value) ?? 'null';
+  }
+  if (Array.isArray(value)) {
+    return '[' + value.map(stableStringify).join(',') + ']';
+  }
+  const keys = Object.keys(value).filter(k => value[k] !== undefined).sort();
+  return '{' + keys.map(k => JSON.stringify(k) + ':' + stableStringify(value[k])).join(',') + '}';
+}
+
+// cyrb53 - only used where crypto.subtle is unavailable (non-secure contexts)
+function fallbackHash(text: string): string {
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (h2 >>> 0).toString(16).padStart(8, '0') + (h1 >>> 0).toString(16).padStart(8, '0') + '-' + text.length;
+}
+
+async function hashText(text: string): Promise<string> {
+  if (typeof crypto !== 'undefined' && crypto.subtle) {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+  }
+  return fallbackHash(text);
+}
+
+function requestToPromise<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+class RenderCache {
+  private memory = new Map<string, string>();
+  private memoryBytes = 0;
+  private inFlight = new Map<string, Promise<string>>();
+  private dbPromise: Promise<IDBDatabase | null> | null = null;
+  private diskEntries = 0;
+  private diskBytes = 0;
+  private stats = { memoryHits: 0, diskHits: 0, misses: 0, evictions: 0 };
+
+  constructor(
+    private memoryMaxBytes: number = DEFAULT_MEMORY_MAX_BYTES,
+    private diskMaxBytes: number = DEFAULT_DISK_MAX_BYTES
+  ) {}
+
+  // Cached renderToSVG
+  async getSVG(layoutData: LayoutData, regionContents: RegionContentsMap = {}, options: RenderOptions = {}): Promise<string> {
+    const key = await this.buildKey('svg', layoutData, regionContents, options);
+    return this.getOrRender(key, 'svg', async () => renderToSVG(layoutData, regionContents, options));
+  }
+
+  // Cached renderToImage (PNG data URL)
+  async getImage(layoutData: LayoutData, regionContents: RegionContentsMap = {}, options: RenderOptions = {}): Promise<string> {
+    const key = await this.buildKey('png', layoutData, regionContents, options);
+    return this.getOrRender(key, 'png', () => renderToImage(layoutData, regionContents, options));
+  }
+
+  getStats(): RenderCacheStats {
+    const lookups = this.stats.memoryHits + this.stats.diskHits + this.stats.misses;
+    return {
+      ...this.stats,
+      memoryEntries: this.memory.size,
+      memoryBytes: this.memoryBytes,
+      diskEntries: this.diskEntries,
+      diskBytes: this.diskBytes,
+      hitRate: lookups ? (this.stats.memoryHits + this.stats.diskHits) / lookups : 0
+    };
+  }
+
+  async clear(): Promise<void> {
+    this.memory.clear();
+    this.memoryBytes = 0;
+    const db = await this.openDatabase();
+    if (db) {
+      const tx = db.transaction([META_STORE, PAYLOAD_STORE], 'readwrite');
+      await Promise.all([
+        requestToPromise(tx.objectStore(META_STORE).clear()),
+        requestToPromise(tx.objectStore(PAYLOAD_STORE).clear())
+      ]);
+    }
+    this.diskEntries = 0;
+    this.diskBytes = 0;
+  }
+
+  private async buildKey(kind: RenderKind, layoutData: LayoutData, regionContents: RegionContentsMap, options: RenderOptions): Promise<string> {
+    // Hashed on every call: layouts are edited in place, so object identity says nothing about content
+    const [layoutHash, variablesHash, optionsHash] = await Promise.all([
+      hashText(stableStringify(layoutData)),
+      hashText(stableStringify(regionContents)),
+      hashText(stableStringify(options))
+    ]);
+    return `${RENDERER_VERSION}:${kind}:${layoutHash}:${variablesHash}:${optionsHash}`;
+  }
+
+  private async getOrRender(key: string, kind: RenderKind, render: () => Promise<string>): Promise<string> {
+    const cached = this.memory.get(key);
+    if (cached !== undefined) {
+      // Re-insert to mark as most recently used
+      this.memory.delete(key);
+      this.memory.set(key, cached);
+      this.stats.memoryHits++;
+      return cached;
+    }
+
+    // Identical renders requested at the same time share one render
+    const pending = this.inFlight.get(key);
+    if (pending) return pending;
+
+    const promise = (async () => {
+      const stored = await this.readFromDisk(key);
+      if (stored !== null) {
+        this.stats.diskHits++;
+        this.remember(key, stored);
+        return stored;
+      }
+      this.stats.misses++;
+      const value = await render();
+      this.remember(key, value);
+      this.writeToDisk(key, kind, value);
+      return value;
+    })();
+
+    this.inFlight.set(key, promise);
+    try {
+      return await promise;
+    } finally {
+      this.inFlight.delete(key);
+    }
+  }
+
+  private remember(key: string, value: string): void {
+    if (value.length > this.memoryMaxBytes) return;
+    this.memory.set(key, value);
+    this.memoryBytes += value.length;
+    while (this.memoryBytes > this.memoryMaxBytes) {
+      // Map keeps insertion order: the first key is the least recently used
+      const oldest = this.memory.keys().next().value as string;
+      this.memoryBytes -= (this.memory.get(oldest) || '').length;
+      this.memory.delete(oldest);
+    }
+  }
+
+  private openDatabase(): Promise<IDBDatabase | null> {
+    if (!this.dbPromise) {
+      this.dbPromise = new Promise<IDBDatabase | null>(resolve => {
+        if (typeof indexedDB === 'undefined') {
+          resolve(null);
+          return;
+        }
+        const request = indexedDB.open(DB_NAME, DB_VERSION);
+        request.onupgradeneeded = () => {
+          const db = request.result;
+          if (db.objectStoreNames.contains(LEGACY_STORE)) {
+            db.deleteObjectStore(LEGACY_STORE);
+          }
+          const meta = db.createObjectStore(META_STORE, { keyPath: 'key' });
+          meta.createIndex('lastAccess', 'lastAccess');
+          db.createObjectStore(PAYLOAD_STORE);
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => {
+          console.warn('⚠️ Render cache: IndexedDB unavailable, using memory only', request.error);
+          resolve(null);
+        };
+      }).then(async db => {
+        if (db) await this.loadDiskUsage(db);
+        return db;
+      });
+    }
+    return this.dbPromise;
+  }
+
+  // Totals come from the metadata store only; payloads stay on disk
+  private async loadDiskUsage(db: IDBDatabase): Promise<void> {
+    const entries = await requestToPromise(
+      db.transaction(META_STORE, 'readonly').objectStore(META_STORE).getAll()
+    ) as CacheEntryMeta[];
+    this.diskEntries = entries.length;
+    this.diskBytes = entries.reduce((total, entry) => total + entry.size, 0);
+  }
+
+  private async readFromDisk(key: string): Promise<string | null> {
+    try {
+      const db = await this.openDatabase();
+      if (!db) return null;
+      const tx = db.transaction([META_STORE, PAYLOAD_STORE], 'readwrite');
+      const meta = tx.objectStore(META_STORE);
+      const [entry, value] = await Promise.all([
+        requestToPromise(meta.get(key)) as Promise<CacheEntryMeta | undefined>,
+        requestToPromise(tx.objectStore(PAYLOAD_STORE).get(key)) as Promise<string | undefined>
+      ]);
+      if (!entry || value === undefined) return null;
+      const now = Date.now();
+      if (now - entry.lastAccess > ACCESS_UPDATE_INTERVAL) {
+        meta.put({ ...entry, lastAccess: now });
+      }
+      return value;
+    } catch (error) {
+      console.warn('⚠️ Render cache read failed:', error);
+      return null;
+    }
+  }
+
+  private async writeToDisk(key: string, kind: RenderKind, value: string): Promise<void> {
+    try {
+      const db = await this.openDatabase();
+      if (!db) return;
+      const now = Date.now();
+      const entry: CacheEntryMeta = { key, kind, size: value.length, createdAt: now, lastAccess: now };
+      const tx = db.transaction([META_STORE, PAYLOAD_STORE], 'readwrite');
+      const meta = tx.objectStore(META_STORE);
+      // Overwriting an existing key (e.g. a render finished in another tab) replaces its size
+      const previous = await requestToPromise(meta.get(key)) as CacheEntryMeta | undefined;
+      await Promise.all([
+        requestToPromise(meta.put(entry)),
+        requestToPromise(tx.objectStore(PAYLOAD_STORE).put(value, key))
+      ]);
+      if (previous) {
+        this.diskBytes += entry.size - previous.size;
+      } else {
+        this.diskEntries++;
+        this.diskBytes += entry.size;
+      }
+      if (this.diskBytes > this.diskMaxBytes) {
+        await this.evictFromDisk(db);
+      }
+    } catch (error) {
+      console.warn('⚠️ Render cache write failed:', error);
+    }
+  }
+
+  // Delete least recently used entries until the store is back under its target size
+  private async evictFromDisk(db: IDBDatabase): Promise<void> {
+    const target = this.diskMaxBytes * DISK_EVICTION_TARGET;
+    const tx = db.transaction([META_STORE, PAYLOAD_STORE], 'readwrite');
+    const payloads = tx.objectStore(PAYLOAD_STORE);
+    await new Promise<void>((resolve, reject) => {
+      const request = tx.objectStore(META_STORE).index('lastAccess').openCursor();
+      request.onsuccess = () => {
+        const cursor = request.result;
+        if (!cursor || this.diskBytes <= target) {
+          resolve();
+          return;
+        }
+        const entry = cursor.value as CacheEntryMeta;
+        this.diskBytes -= entry.size;
+        this.diskEntries--;
+        this.stats.evictions++;
+        payloads.delete(entry.key);
+        cursor.delete();
+        cursor.continue();
+      };
+      request.onerror = () => reject(request.error);
+    });
+  }
+}
+
+export const renderCache = new RenderCache();
+export default renderCache;
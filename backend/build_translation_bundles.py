@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Build precompiled translation bundles for the frontend
+Compiles the composition table into per-language and all-language JSON bundles,
+minified, pre-compressed (gzip + brotli) and named by content hash, with a manifest.
+Only bundles whose data changed are rewritten.
+"""
+
+import sqlite3
+import os
+import sys
+import json
+import gzip
+import hashlib
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Language order for frontend array (same as get_full_translations.py)
+LANGUAGE_COLUMNS = [
+    'spanish', 'french', 'english', 'portuguese', 'dutch', 'italian',
+    'greek', 'japanese', 'german', 'danish', 'slovenian', 'chinese',
+    'korean', 'indonesian', 'arabic', 'galician', 'catalan', 'basque'
+]
+
+ALL_BUNDLE_NAME = 'all'
+MANIFEST_NAME = 'manifest.json'
+
+
+def get_default_output_dir():
+    """Default output folder inside the viewer's public assets"""
+    return os.path.join(os.path.dirname(__file__), '..', 'ai-coordinate-viewer', 'public', 'translations')
+
+
+def load_translations(conn):
+    """Load all materials with their 18 translations from the fallback-resolved table"""
+    # Imported here: resolved_translations itself imports LANGUAGE_COLUMNS from this module
+    from resolved_translations import RESOLVED_TABLE, ensure_resolved_translations
+
+    ensure_resolved_translations(conn)
+    cursor = conn.cursor()
+    columns_str = ', '.join(LANGUAGE_COLUMNS)
+    cursor.execute(f"SELECT material, {columns_str} FROM {RESOLVED_TABLE} ORDER BY material")
+
+    translations = {}
+    for row in cursor.fetchall():
+        translations[row[0]] = list(row[1:])
+    return translations
+
+
+def build_bundles(translations):
+    """Build bundle payloads: one per language plus one with all languages"""
+    bundles = {}
+    for i, lang in enumerate(LANGUAGE_COLUMNS):
+        bundles[lang] = {material: values[i] for material, values in translations.items()}
+
+    bundles[ALL_BUNDLE_NAME] = {
+        'languages': LANGUAGE_COLUMNS,
+        'translations': translations
+    }
+    return bundles
+
+
+def minify(payload):
+    """Serialize payload as minified, deterministic JSON bytes"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def content_hash(data):
+    """Short content hash used in bundle file names"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def load_manifest(output_dir):
+    """Load the previous manifest, or an empty one"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {'bundles': {}}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read previous manifest, rebuilding all bundles: {e}")
+        return {'bundles': {}}
+
+
+def write_bundle(output_dir, name, data, digest):
+    """Write the minified bundle and its compressed variants, return the manifest entry"""
+    file_name = f"{name}.{digest}.json"
+    file_path = os.path.join(output_dir, file_name)
+
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+    # mtime=0 keeps gzip output byte-identical across rebuilds
+    with open(file_path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+    entry = {
+        'file': file_name,
+        'hash': digest,
+        'size': len(data),
+        'gzip': file_name + '.gz'
+    }
+
+    if brotli is not None:
+        with open(file_path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        entry['brotli'] = file_name + '.br'
+
+    return entry
+
+
+def remove_bundle_files(output_dir, entry):
+    """Remove the files of a bundle entry that is no longer current"""
+    for key in ('file', 'gzip', 'brotli'):
+        file_name = entry.get(key)
+        if not file_name:
+            continue
+        file_path = os.path.join(output_dir, file_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def build_translation_bundles(output_dir):
+    """Compile the composition table into hashed bundles and update the manifest"""
+    db_path = os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        translations = load_translations(conn)
+        conn.close()
+    except Exception as e:
+        print(f"❌ Error querying database: {e}")
+        return False
+
+    print(f"📋 Loaded {len(translations)} materials from composition table")
+    if brotli is None:
+        print("⚠️ brotli module not installed - skipping .br files (pip install brotli)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir).get('bundles', {})
+    bundles = build_bundles(translations)
+
+    manifest_bundles = {}
+    written = 0
+    for name, payload in bundles.items():
+        data = minify(payload)
+        digest = content_hash(data)
+        old_entry = previous.get(name)
+
+        files_present = old_entry is not None and all(
+            os.path.exists(os.path.join(output_dir, old_entry[key]))
+            for key in ('file', 'gzip', 'brotli') if old_entry.get(key)
+        )
+        needs_brotli = brotli is not None and old_entry is not None and 'brotli' not in old_entry
+
+        if old_entry and old_entry.get('hash') == digest and files_present and not needs_brotli:
+            manifest_bundles[name] = old_entry
+            continue
+
+        manifest_bundles[name] = write_bundle(output_dir, name, data, digest)
+        written += 1
+        print(f"✅ {name}: {manifest_bundles[name]['file']} ({len(data)} bytes)")
+
+        if old_entry and old_entry.get('file') != manifest_bundles[name]['file']:
+            remove_bundle_files(output_dir, old_entry)
+
+    # Drop bundles that no longer exist (e.g. a language was removed)
+    for name, old_entry in previous.items():
+        if name not in manifest_bundles:
+            remove_bundle_files(output_dir, old_entry)
+
+    if written == 0 and set(previous) == set(manifest_bundles):
+        print("✅ All bundles up to date - nothing to rebuild")
+        return True
+
+    manifest = {
+        'generatedAt': datetime.now().isoformat(),
+        'languages': LANGUAGE_COLUMNS,
+        'materialCount': len(translations),
+        'bundles': manifest_bundles
+    }
+    # The manifest is the only file that is not content-addressed, so write it atomically
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    print(f"\n📊 SUMMARY:")
+    print(f"  Bundles rebuilt: {written}")
+    print(f"  Bundles unchanged: {len(manifest_bundles) - written}")
+    print(f"  Manifest: {manifest_path}")
+    return True
+
+
+if __name__ == "__main__":
+    print("📦 Building translation bundles...")
+    print("=" * 60)
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else get_default_output_dir()
+    print(f"📁 Output folder: {os.path.abspath(output_dir)}")
+
+    build_translation_bundles(output_dir)
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Change feed for incremental sync to label stations and other clients
+Returns only the rows changed since a cursor, as compact delta bundles, instead of whole
+tables. AFTER INSERT/UPDATE triggers record each changed row in change_log under a new
+sequence number; deletions are recorded as tombstones by AFTER DELETE triggers. The Excel
+import's table swap records both itself, since it bypasses the triggers.
+
+A cursor is an opaque token holding the last change_log and tombstone sequence numbers.
+Sequence numbers are assigned inside the write transaction, and SQLite runs one writer at a
+time, so they follow commit order. updatedAt does not: Prisma sets it in the application
+before the write, and a row committed late with an earlier updatedAt would be skipped.
+
+Apply a bundle by deleting the `deleted` keys first, then upserting the `changes` rows.
+
+Usage:
+    py change_feed.py setup
+    py change_feed.py export --cursor-file station1.cursor --output delta.json.gz
+    py change_feed.py export --since <cursor> [--tables composition_resolved,shortform]
+    py change_feed.py cursor
+"""
+
+import sqlite3
+import os
+import sys
+import json
+import gzip
+import base64
+import argparse
+
+from master_file_store import BLOB_FIELDS, MasterFileStore, is_blob_ref
+
+# Synced tables: (key column, change timestamp column). The timestamp orders full snapshots
+# and detects changed rows in the Excel import's swap. users is left out on purpose
+# (password hashes).
+TRACKED_TABLES = {
+    'shortform': ('id', 'updatedAt'),
+    'composition': ('id', 'updatedAt'),
+    'composition_resolved': ('material', 'refreshedAt'),
+    'customers': ('id', 'updatedAt'),
+    'suppliers': ('id', 'updatedAt'),
+    'master_files': ('id', 'updatedAt'),
+    'orders': ('id', 'updatedAt'),
+}
+
+TOMBSTONE_TABLE = 'change_tombstones'
+CHANGE_LOG_TABLE = 'change_log'
+BUNDLE_FORMAT_VERSION = 2
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def get_existing_tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def change_log_trigger_sql(table, key_column, event):
+    """AFTER INSERT/UPDATE trigger moving the row to the end of change_log"""
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS "{table}_change_log_{event.lower()}" AFTER {event} ON "{table}"
+        BEGIN
+            DELETE FROM "{CHANGE_LOG_TABLE}" WHERE "tableName" = '{table}' AND "rowKey" = NEW."{key_column}";
+            INSERT INTO "{CHANGE_LOG_TABLE}" ("tableName", "rowKey") VALUES ('{table}', NEW."{key_column}");
+        END
+    '''
+
+
+def ensure_change_tracking(conn):
+    """Create the change log and tombstone tables, indexes and triggers (idempotent).
+
+    The Prisma migration creates the same objects; this covers databases where it hasn't run
+    and tables created later (e.g. composition_resolved on first refresh).
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{TOMBSTONE_TABLE}" (
+            "seq" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            "tableName" TEXT NOT NULL,
+            "rowKey" TEXT NOT NULL,
+            "deletedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # One row per changed row: a later change replaces it with a higher seq
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{CHANGE_LOG_TABLE}" (
+            "seq" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            "tableName" TEXT NOT NULL,
+            "rowKey" TEXT NOT NULL,
+            "changedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{CHANGE_LOG_TABLE}_tableName_rowKey_key" '
+                 f'ON "{CHANGE_LOG_TABLE}"("tableName", "rowKey")')
+    existing = get_existing_tables(conn)
+    for table, (key_column, time_column) in TRACKED_TABLES.items():
+        if table not in existing:
+            continue
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_{time_column}_idx" ON "{table}"("{time_column}")')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS "{table}_tombstone" AFTER DELETE ON "{table}"
+            BEGIN
+                INSERT INTO "{TOMBSTONE_TABLE}" ("tableName", "rowKey") VALUES ('{table}', OLD."{key_column}");
+            END
+        ''')
+        conn.execute(change_log_trigger_sql(table, key_column, 'INSERT'))
+        conn.execute(change_log_trigger_sql(table, key_column, 'UPDATE'))
+    conn.commit()
+
+
+def record_swap_tombstones(conn, table_name, shadow_name):
+    """Tombstone rows of `table_name` missing from its replacement.
+
+    DROP TABLE does not fire delete triggers, so import_excel_data calls this inside its
+    swap transaction, before dropping the live table.
+    """
+    if table_name not in TRACKED_TABLES or TOMBSTONE_TABLE not in get_existing_tables(conn):
+        return 0
+    key_column = TRACKED_TABLES[table_name][0]
+    cursor = conn.execute(f'''
+        INSERT INTO "{TOMBSTONE_TABLE}" ("tableName", "rowKey")
+        SELECT ?, "{key_column}" FROM "{table_name}"
+        WHERE "{key_column}" NOT IN (SELECT "{key_column}" FROM "{shadow_name}")
+    ''', (table_name,))
+    return cursor.rowcount
+
+
+def record_swap_changes(conn, table_name, shadow_name):
+    """Log rows of `shadow_name` that are new or changed compared with `table_name`.
+
+    Rows loaded into the shadow table bypass the triggers, so import_excel_data calls this
+    inside its swap transaction. Unchanged rows keep their id and updatedAt there and are
+    therefore not logged.
+    """
+    if table_name not in TRACKED_TABLES or CHANGE_LOG_TABLE not in get_existing_tables(conn):
+        return 0
+    key_column, time_column = TRACKED_TABLES[table_name]
+    conn.execute(f'''
+        CREATE TEMP TABLE swap_changes AS
+        SELECT s."{key_column}" AS rowKey FROM "{shadow_name}" s
+        LEFT JOIN "{table_name}" l ON l."{key_column}" = s."{key_column}"
+        WHERE l."{key_column}" IS NULL OR l."{time_column}" IS NOT s."{time_column}"
+    ''')
+    try:
+        conn.execute(f'''
+            DELETE FROM "{CHANGE_LOG_TABLE}"
+            WHERE "tableName" = ? AND "rowKey" IN (SELECT rowKey FROM temp.swap_changes)
+        ''', (table_name,))
+        cursor = conn.execute(f'''
+            INSERT INTO "{CHANGE_LOG_TABLE}" ("tableName", "rowKey") SELECT ?, rowKey FROM temp.swap_changes
+        ''', (table_name,))
+        return cursor.rowcount
+    finally:
+        conn.execute('DROP TABLE temp.swap_changes')
+
+
+def encode_cursor(state):
+    payload = json.dumps(state, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Cursor token -> {'log': n, 'seq': n}; empty token means full sync.
+
+    'log' is None for an empty token and for cursors from the earlier updatedAt-based
+    format, whose rows are then all sent once again (their tombstone seq still applies).
+    """
+    if not token:
+        return {'log': None, 'seq': 0}
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        log = state.get('log')
+        return {'log': int(log) if log is not None else None, 'seq': int(state.get('seq', 0))}
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def check_tables(tables):
+    tables = tables or list(TRACKED_TABLES)
+    unknown = [table for table in tables if table not in TRACKED_TABLES]
+    if unknown:
+        raise ValueError(f"Not a tracked table: {', '.join(unknown)}")
+    return tables
+
+
+def max_seq(conn, table, existing):
+    if table not in existing:
+        return 0
+    return conn.execute(f'SELECT COALESCE(MAX(seq), 0) FROM "{table}"').fetchone()[0]
+
+
+def current_cursor(conn, tables=None):
+    """Cursor for the current state, for clients that already hold an up-to-date copy"""
+    check_tables(tables)
+    existing = get_existing_tables(conn)
+    return encode_cursor({'log': max_seq(conn, CHANGE_LOG_TABLE, existing),
+                          'seq': max_seq(conn, TOMBSTONE_TABLE, existing)})
+
+
+def get_changes(conn, since=None, tables=None):
+    """Delta bundle of everything changed after cursor `since` (None: full snapshot).
+
+    All reads run in one transaction, so the bundle and its new cursor describe a single
+    consistent state of the database even while the API keeps writing.
+    """
+    since = since or None
+    state = decode_cursor(since)
+    tables = check_tables(tables)
+
+    bundle = {'version': BUNDLE_FORMAT_VERSION, 'full': since is None, 'changes': {}, 'deleted': {}}
+    master_files = MasterFileStore(conn)
+
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        existing = get_existing_tables(conn)
+        new_state = {'log': max_seq(conn, CHANGE_LOG_TABLE, existing), 'seq': max_seq(conn, TOMBSTONE_TABLE, existing)}
+        for table in tables:
+            if table not in existing:
+                continue
+            key_column, time_column = TRACKED_TABLES[table]
+            if state['log'] is None:
+                cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY "{time_column}", "{key_column}"')
+            else:
+                cursor = conn.execute(f'''
+                    SELECT t.* FROM "{CHANGE_LOG_TABLE}" c JOIN "{table}" t ON t."{key_column}" = c."rowKey"
+                    WHERE c."tableName" = ? AND c.seq > ? ORDER BY c.seq
+                ''', (table, state['log']))
+            columns = [description[0] for description in cursor.description]
+            rows = [list(row) for row in cursor]
+            if not rows:
+                continue
+
+            if table == 'master_files':
+                # Ship plain payloads rather than master_file_blobs references
+                key_index = columns.index(key_column)
+                for row in rows:
+                    for i, column in enumerate(columns):
+                        if column in BLOB_FIELDS and is_blob_ref(row[i]):
+                            row[i] = master_files.get_field(row[key_index], column)
+
+            bundle['changes'][table] = {'key': key_column, 'columns': columns, 'rows': rows}
+
+        if TOMBSTONE_TABLE in existing and since is not None:
+            placeholders = ', '.join('?' for _ in tables)
+            for seq, table, row_key in conn.execute(f'''
+                SELECT seq, tableName, rowKey FROM "{TOMBSTONE_TABLE}"
+                WHERE seq > ? AND tableName IN ({placeholders}) ORDER BY seq
+            ''', [state['seq']] + tables):
+                bundle['deleted'].setdefault(table, []).append(row_key)
+    finally:
+        if own_transaction:
+            conn.execute("COMMIT")
+
+    bundle['since'] = since
+    bundle['cursor'] = encode_cursor(new_state)
+    return bundle
+
+
+def write_bundle(bundle, output_path):
+    """Write a bundle as compact JSON; gzip when the path ends in .gz"""
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if output_path.endswith('.gz'):
+        payload = gzip.compress(payload, 9)
+    with open(output_path, 'wb') as f:
+        f.write(payload)
+    return len(payload)
+
+
+def print_bundle_summary(bundle):
+    for table, change in bundle['changes'].items():
+        print(f"  {table}: {len(change['rows'])} changed")
+    for table, keys in bundle['deleted'].items():
+        print(f"  {table}: {len(keys)} deleted")
+    if not bundle['changes'] and not bundle['deleted']:
+        print("  No changes")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Incremental change feed over a trigger-written change log')
+    parser.add_argument('command', choices=['setup', 'export', 'cursor'])
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--since', help='Cursor from a previous export (omit for a full snapshot)')
+    parser.add_argument('--cursor-file', help='Read the cursor from and save the new cursor to this file')
+    parser.add_argument('--tables', help='Comma-separated tables (default: all tracked tables)')
+    parser.add_argument('--output', help='Bundle file (.json or .json.gz; default: print to stdout)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    db_path = args.db or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return
+
+    # isolation_level=None: get_changes manages its own read transaction
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        ensure_change_tracking(conn)
+
+        if args.command == 'setup':
+            print("✅ Change tracking ready (change log and tombstone triggers)")
+            return
+
+        since = args.since
+        if since is None and args.cursor_file and os.path.exists(args.cursor_file):
+            with open(args.cursor_file, 'r', encoding='utf-8') as f:
+                since = f.read().strip() or None
+        tables = args.tables.split(',') if args.tables else None
+
+        if args.command == 'cursor':
+            print(current_cursor(conn, tables))
+            return
+
+        bundle = get_changes(conn, since, tables)
+        if args.output:
+            size = write_bundle(bundle, args.output)
+            print(f"📦 {'Full snapshot' if bundle['full'] else 'Delta'} written to {args.output} ({size} bytes)")
+            print_bundle_summary(bundle)
+        else:
+            print(json.dumps(bundle, ensure_ascii=False, separators=(',', ':'), default=str))
+
+        if args.cursor_file:
+            with open(args.cursor_file, 'w', encoding='utf-8') as f:
+                f.write(bundle['cursor'])
+    except (OSError, ValueError, LookupError, sqlite3.Error) as e:
+        print(f"❌ {args.command} failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ Get complete 18-language translations for specific materials
 import sqlite3
 import os
 
+from build_translation_bundles import LANGUAGE_COLUMNS
+from resolved_translations import ensure_resolved_translations, get_resolved_translations, fallback_languages
+
 def get_full_translations(materials):
     """Get complete translations for specific materials"""
     db_path = os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
@@ -16,14 +19,10 @@ def get_full_translations(materials):
     
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
         
-        # Language order for frontend array
-        language_columns = [
-            'spanish', 'french', 'english', 'portuguese', 'dutch', 'italian',
-            'greek', 'japanese', 'german', 'danish', 'slovenian', 'chinese',
-            'korean', 'indonesian', 'arabic', 'galician', 'catalan', 'basque'
-        ]
+        # Resolved rows already have every language filled (see resolved_translations.py)
+        ensure_resolved_translations(conn)
+        resolved = get_resolved_translations(conn, materials)
         
         print("🌍 COMPLETE 18-LANGUAGE TRANSLATIONS:")
         print("=" * 60)
@@ -31,20 +30,17 @@ def get_full_translations(materials):
         for material in materials:
             print(f"\n🔍 {material}:")
             
-            # Build query for all language columns
-            columns_str = ', '.join(language_columns)
-            cursor.execute(f"SELECT {columns_str} FROM composition WHERE material = ?", (material,))
-            row = cursor.fetchone()
-            
-            if row:
+            if material in resolved:
                 # Create the array format for frontend
-                translations = [str(val) if val else material.lower() for val in row]
+                translations, fallback_mask = resolved[material]
                 print(f"  '{material}': {translations},")
                 
-                # Also show readable format
+                # Also show readable format, marking cells filled by fallback
                 print("  Readable format:")
-                for i, lang in enumerate(language_columns):
-                    print(f"    {lang}: {translations[i]}")
+                filled = fallback_languages(fallback_mask)
+                for i, lang in enumerate(LANGUAGE_COLUMNS):
+                    marker = " (fallback)" if lang in filled else ""
+                    print(f"    {lang}: {translations[i]}{marker}")
             else:
                 print(f"❌ NOT FOUND: {material}")
         
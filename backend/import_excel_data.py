@@ -4,12 +4,42 @@ Excel to SQLite Database Import Script
 Imports data from Excel sheets 'shortform' and 'composition' into SQLite database tables.
 """
 
-import pandas as pd
 import sqlite3
 import os
+import re
 import sys
+import time
 from datetime import datetime
 
+from change_feed import record_swap_changes, record_swap_tombstones
+from resolved_translations import refresh_resolved_translations
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Imports load into "<table>_shadow" and are swapped in at the end, so the API never
+# sees an empty or half-loaded table
+SHADOW_SUFFIX = '_shadow'
+
+# Composition sheet layout: column 0 is ELEMENT (material name), then one column per language
+COMPOSITION_LANGUAGES = [
+    'spanish', 'french', 'english', 'portuguese', 'dutch', 'italian',
+    'greek', 'japanese', 'german', 'danish', 'slovenian', 'chinese',
+    'korean', 'indonesian', 'arabic', 'galician', 'catalan', 'basque'
+]
+
+# Rows per INSERT batch in streaming mode
+DEFAULT_BATCH_SIZE = 1000
+
+# Natural keys used to carry ids over from the live table, so re-importing an unchanged
+# sheet keeps every row's identity (and the change feed has nothing to send)
+NATURAL_KEYS = {
+    'shortform': ['symbol', 'code'],
+    'composition': ['material'],
+}
+
 def connect_to_database():
     """Connect to the SQLite database"""
     db_path = os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
@@ -19,7 +49,9 @@ def connect_to_database():
         return None
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_path, timeout=30)
+        # WAL: readers keep using the old tables while the import writes and swaps
+        conn.execute("PRAGMA journal_mode=WAL")
         print(f"✅ Connected to database: {db_path}")
         return conn
     except Exception as e:
@@ -33,6 +65,8 @@ def read_excel_file(file_path):
         return None, None
     
     try:
+        import pandas as pd
+
         # Read both sheets
         shortform_df = pd.read_excel(file_path, sheet_name='shortform')
         composition_df = pd.read_excel(file_path, sheet_name='composition')
@@ -82,6 +116,35 @@ def create_tables_if_not_exist(conn):
     conn.commit()
     print("✅ Tables created/verified")
 
+def clean_cell(value):
+    """Normalize a cell value to text ('' for empty / NaN cells)"""
+    if value is None:
+        return ''
+    text = str(value)
+    return text if text != 'nan' else ''
+
+def shortform_row_values(cells):
+    """Map positional sheet cells to (symbol, code, name, category, description)"""
+    return tuple(clean_cell(cells[i]) if i < len(cells) else '' for i in range(5))
+
+def composition_row_values(cells):
+    """Map positional sheet cells to (material, 18 language values)"""
+    material = clean_cell(cells[0]) if len(cells) > 0 else ''
+    # Columns 1-18, default empty if the column doesn't exist
+    language_values = [clean_cell(cells[i + 1]) if i + 1 < len(cells) else ''
+                       for i in range(len(COMPOSITION_LANGUAGES))]
+    return material, language_values
+
+def get_rss_mb():
+    """Current resident memory of this process in MB, or None if unavailable"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
 def generate_cuid():
     """Generate a simple CUID-like ID"""
     import random
@@ -90,12 +153,152 @@ def generate_cuid():
     random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
     return f"c{timestamp}{random_part}"
 
-def import_shortform_data(conn, df):
-    """Import shortform data into the database"""
+def create_shadow_table(conn, table_name):
+    """Create an empty copy of a live table to import into, returns its name"""
+    cursor = conn.cursor()
+    shadow_name = table_name + SHADOW_SUFFIX
+
+    # Leftover from an interrupted import; its indexes may have been moved off the live table
+    restore_live_indexes(conn, table_name)
+    cursor.execute(f'DROP TABLE IF EXISTS "{shadow_name}"')
+
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    create_sql = cursor.fetchone()[0]
+    create_sql = re.sub(r'^CREATE TABLE\s+("?)' + re.escape(table_name) + r'\1',
+                        f'CREATE TABLE "{shadow_name}"', create_sql, count=1)
+    cursor.execute(create_sql)
+    conn.commit()
+    return shadow_name
+
+
+def retarget_index_sql(index_sql, from_table, to_table):
+    """Point a CREATE INDEX statement at another table"""
+    return re.sub(r'\bON\s+("?)' + re.escape(from_table) + r'\1\s*\(', f'ON "{to_table}"(', index_sql, count=1)
+
+
+def move_indexes_to_shadow(conn, table_name):
+    """Build the live table's explicit indexes on its shadow copy, before the swap
+
+    Index names are global in SQLite and cannot be renamed, so each live index is dropped
+    and created under the same name on the shadow table. ALTER TABLE RENAME carries the
+    indexes along, so the swap itself builds nothing. Until the swap, the live table is
+    served without its secondary indexes (its primary key is kept). Returns the index count.
+    """
+    shadow_name = table_name + SHADOW_SUFFIX
+    index_sqls = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                              (table_name,)).fetchall()
+    for name, index_sql in index_sqls:
+        conn.execute(f'DROP INDEX "{name}"')
+        conn.execute(retarget_index_sql(index_sql, table_name, shadow_name))
+        conn.commit()
+    return len(index_sqls)
+
+
+def restore_live_indexes(conn, table_name):
+    """Give indexes moved to an abandoned shadow table back to the live table"""
+    shadow_name = table_name + SHADOW_SUFFIX
+    index_sqls = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                              (shadow_name,)).fetchall()
+    for name, index_sql in index_sqls:
+        conn.execute(f'DROP INDEX "{name}"')
+        conn.execute(retarget_index_sql(index_sql, shadow_name, table_name))
+        conn.commit()
+
+
+def reuse_existing_ids(conn, table_name):
+    """Give shadow rows the id (and timestamps) of the matching live row
+
+    Rows are matched on the table's natural key; repeated keys are paired in sheet order.
+    createdAt is always carried over, updatedAt only when every other column is unchanged.
+    Returns (reused, unchanged).
+    """
+    shadow_name = table_name + SHADOW_SUFFIX
+    key_columns = NATURAL_KEYS[table_name]
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{shadow_name}")')]
+    content_columns = [c for c in columns if c not in key_columns + ['id', 'createdAt', 'updatedAt']]
+
+    partition = ', '.join(f'"{c}"' for c in key_columns)
+    key_match = ' AND '.join(f'n."{c}" IS o."{c}"' for c in key_columns)
+    same_content = ' AND '.join(f'n."{c}" IS o."{c}"' for c in content_columns) or '1'
+
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS temp.id_map')
+    cursor.execute(f'''
+        CREATE TEMP TABLE id_map AS
+        WITH
+            n AS (SELECT rowid AS rid, *, ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY rowid) AS occurrence
+                  FROM "{shadow_name}"),
+            o AS (SELECT *, ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY rowid) AS occurrence
+                  FROM "{table_name}")
+        SELECT n.rid AS rid, o.id AS id, o.createdAt AS createdAt,
+               CASE WHEN {same_content} THEN o.updatedAt ELSE n.updatedAt END AS updatedAt,
+               ({same_content}) AS unchanged
+        FROM n JOIN o ON {key_match} AND n.occurrence = o.occurrence
+    ''')
+    cursor.execute('CREATE UNIQUE INDEX temp.id_map_rid ON id_map(rid)')
+    cursor.execute(f'''
+        UPDATE "{shadow_name}" SET
+            id = (SELECT m.id FROM id_map m WHERE m.rid = "{shadow_name}".rowid),
+            createdAt = (SELECT m.createdAt FROM id_map m WHERE m.rid = "{shadow_name}".rowid),
+            updatedAt = (SELECT m.updatedAt FROM id_map m WHERE m.rid = "{shadow_name}".rowid)
+        WHERE rowid IN (SELECT rid FROM id_map)
+    ''')
+    reused, unchanged = cursor.execute('SELECT COUNT(*), COALESCE(SUM(unchanged), 0) FROM id_map').fetchone()
+    cursor.execute('DROP TABLE temp.id_map')
+    conn.commit()
+    print(f"🔗 {table_name}: {reused} existing ids kept ({unchanged} rows unchanged)")
+    return reused, unchanged
+
+
+def swap_in_shadow_tables(conn, table_names):
+    """Replace the live tables with their shadow copies in a single transaction
+
+    Rows keep the ids of their live counterparts (see reuse_existing_ids) and the indexes
+    are built on the shadow tables first (see move_indexes_to_shadow), so the write lock is
+    only held for the renames. Readers see either the old or the new data. Triggers are
+    recreated on the swapped-in tables within the same transaction (they hold no data).
+    New and changed rows go to the change feed's log, removed rows to its tombstones.
+    """
+    cursor = conn.cursor()
+    for table_name in table_names:
+        reuse_existing_ids(conn, table_name)
+        moved = move_indexes_to_shadow(conn, table_name)
+        print(f"🗂️ {table_name}: {moved} index(es) built on the shadow table")
+    conn.commit()
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        for table_name in table_names:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND tbl_name=? AND sql IS NOT NULL",
+                           (table_name,))
+            schema_sqls = [row[0] for row in cursor.fetchall()]
+
+            # Shadow inserts and DROP TABLE bypass the change feed triggers
+            record_swap_changes(conn, table_name, table_name + SHADOW_SUFFIX)
+            record_swap_tombstones(conn, table_name, table_name + SHADOW_SUFFIX)
+            cursor.execute(f'DROP TABLE "{table_name}"')
+            cursor.execute(f'ALTER TABLE "{table_name}{SHADOW_SUFFIX}" RENAME TO "{table_name}"')
+            for schema_sql in schema_sqls:
+                cursor.execute(schema_sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        for table_name in table_names:
+            restore_live_indexes(conn, table_name)
+        raise
+
+    print(f"🔁 Swapped in new data for: {', '.join(table_names)}")
+
+
+def refresh_resolved(conn):
+    """Update composition_resolved for the materials the import changed"""
+    updated, deleted, unchanged = refresh_resolved_translations(conn)
+    print(f"🌍 Resolved translations: {updated} updated, {deleted} removed, {unchanged} unchanged")
+
+
+def import_shortform_data(conn, df, table_name='shortform'):
+    """Import shortform data into the given (shadow) table"""
     cursor = conn.cursor()
-    
-    # Clear existing data
-    cursor.execute("DELETE FROM shortform")
     
     # Get column names from DataFrame
     columns = df.columns.tolist()
@@ -120,21 +323,10 @@ def import_shortform_data(conn, df):
             record_id = generate_cuid()
             
             # Extract data based on available columns
-            symbol = str(row.get(columns[0], '')) if len(columns) > 0 else ''
-            code = str(row.get(columns[1], '')) if len(columns) > 1 else ''
-            name = str(row.get(columns[2], '')) if len(columns) > 2 else ''
-            category = str(row.get(columns[3], '')) if len(columns) > 3 else ''
-            description = str(row.get(columns[4], '')) if len(columns) > 4 else ''
-            
-            # Clean up NaN values
-            symbol = symbol if symbol != 'nan' else ''
-            code = code if code != 'nan' else ''
-            name = name if name != 'nan' else ''
-            category = category if category != 'nan' else ''
-            description = description if description != 'nan' else ''
+            symbol, code, name, category, description = shortform_row_values([row.get(c) for c in columns])
             
-            cursor.execute('''
-                INSERT INTO shortform (id, symbol, code, name, category, description, createdAt, updatedAt)
+            cursor.execute(f'''
+                INSERT INTO "{table_name}" (id, symbol, code, name, category, description, createdAt, updatedAt)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (record_id, symbol, code, name, category, description, current_time, current_time))
             
@@ -145,15 +337,12 @@ def import_shortform_data(conn, df):
             continue
     
     conn.commit()
-    print(f"✅ Imported {imported_count} records into shortform table")
+    print(f"✅ Imported {imported_count} records into {table_name} table")
 
-def import_composition_data(conn, df):
-    """Import composition data into the database with all 18 language columns"""
+def import_composition_data(conn, df, table_name='composition'):
+    """Import composition data into the given (shadow) table with all 18 language columns"""
     cursor = conn.cursor()
 
-    # Clear existing data
-    cursor.execute("DELETE FROM composition")
-
     # Get column names from DataFrame
     columns = df.columns.tolist()
     print(f"📋 Composition columns ({len(columns)}): {columns}")
@@ -161,11 +350,7 @@ def import_composition_data(conn, df):
     # Expected column mapping (based on your Excel structure)
     # Column 0: ELEMENT (material name)
     # Column 1: SPANISH, Column 2: FRENCH, Column 3: ENGLISH, etc.
-    expected_languages = [
-        'spanish', 'french', 'english', 'portuguese', 'dutch', 'italian',
-        'greek', 'japanese', 'german', 'danish', 'slovenian', 'chinese',
-        'korean', 'indonesian', 'arabic', 'galician', 'catalan', 'basque'
-    ]
+    expected_languages = COMPOSITION_LANGUAGES
 
     imported_count = 0
     current_time = datetime.now().isoformat()
@@ -175,20 +360,8 @@ def import_composition_data(conn, df):
             # Generate unique ID
             record_id = generate_cuid()
 
-            # Extract material name (first column)
-            material = str(row.get(columns[0], '')) if len(columns) > 0 else ''
-            material = material if material != 'nan' else ''
-
-            # Extract all language translations (columns 1-18)
-            language_values = []
-            for i, lang_column in enumerate(expected_languages):
-                col_index = i + 1  # Skip first column (material)
-                if col_index < len(columns):
-                    value = str(row.get(columns[col_index], ''))
-                    value = value if value != 'nan' else ''
-                    language_values.append(value)
-                else:
-                    language_values.append('')  # Default empty if column doesn't exist
+            # Extract material name (first column) and all language translations (columns 1-18)
+            material, language_values = composition_row_values([row.get(c) for c in columns])
 
             # Build the SQL query dynamically
             sql_columns = ['id', 'material'] + expected_languages + ['createdAt', 'updatedAt']
@@ -198,7 +371,7 @@ def import_composition_data(conn, df):
             sql_values = [record_id, material] + language_values + [current_time, current_time]
 
             cursor.execute(f'''
-                INSERT INTO composition ({sql_column_names})
+                INSERT INTO "{table_name}" ({sql_column_names})
                 VALUES ({sql_placeholders})
             ''', sql_values)
 
@@ -215,7 +388,91 @@ def import_composition_data(conn, df):
             continue
 
     conn.commit()
-    print(f"✅ Imported {imported_count} records into composition table with {len(expected_languages)} languages")
+    print(f"✅ Imported {imported_count} records into {table_name} table with {len(expected_languages)} languages")
+
+def iter_sheet_rows(file_path, sheet_name):
+    """Stream a worksheet row by row with openpyxl read-only mode
+
+    Yields the header row first, then data rows as tuples of raw cell values.
+    Fully empty rows are skipped. Memory use does not depend on the sheet size.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            if any(cell is not None for cell in row):
+                yield row
+    finally:
+        workbook.close()
+
+def report_progress(label, count, started):
+    """Print rows imported, rate and current memory use"""
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0
+    rss = get_rss_mb()
+    rss_text = f", RSS {rss:.1f} MB" if rss is not None else ''
+    print(f"   ⏳ {label}: {count} rows ({rate:.0f} rows/s{rss_text})")
+
+def stream_import_sheet(conn, rows, table_name, sql_columns, to_values, label, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert streamed sheet rows in fixed-size batches
+
+    to_values maps the positional cells of a row to the values for sql_columns
+    (without id/createdAt/updatedAt). Returns the number of rows imported.
+    """
+    cursor = conn.cursor()
+    header = next(rows, None)
+    if header is None:
+        print(f"⚠️ {label} sheet is empty")
+        return 0
+    print(f"📋 {label} columns ({len(header)}): {list(header)}")
+
+    all_columns = ['id'] + sql_columns + ['createdAt', 'updatedAt']
+    insert_sql = (f'INSERT INTO "{table_name}" ({", ".join(all_columns)}) '
+                  f'VALUES ({", ".join("?" for _ in all_columns)})')
+
+    current_time = datetime.now().isoformat()
+    started = time.perf_counter()
+    imported_count = 0
+    batch = []
+
+    for cells in rows:
+        batch.append([generate_cuid()] + list(to_values(cells)) + [current_time, current_time])
+        if len(batch) >= batch_size:
+            cursor.executemany(insert_sql, batch)
+            conn.commit()
+            imported_count += len(batch)
+            batch = []
+            if imported_count % (batch_size * 10) == 0:
+                report_progress(label, imported_count, started)
+
+    if batch:
+        cursor.executemany(insert_sql, batch)
+        conn.commit()
+        imported_count += len(batch)
+        report_progress(label, imported_count, started)
+    print(f"✅ Imported {imported_count} records into {table_name} table")
+    return imported_count
+
+def stream_import(conn, file_path, batch_size=DEFAULT_BATCH_SIZE):
+    """Streaming import of both sheets into shadow tables (bounded memory)"""
+    print("\n📥 Streaming ShortForm data...")
+    stream_import_sheet(
+        conn, iter_sheet_rows(file_path, 'shortform'), create_shadow_table(conn, 'shortform'),
+        ['symbol', 'code', 'name', 'category', 'description'], shortform_row_values,
+        'ShortForm', batch_size
+    )
+
+    def composition_values(cells):
+        material, language_values = composition_row_values(cells)
+        return [material] + language_values
+
+    print("\n📥 Streaming Composition data...")
+    stream_import_sheet(
+        conn, iter_sheet_rows(file_path, 'composition'), create_shadow_table(conn, 'composition'),
+        ['material'] + COMPOSITION_LANGUAGES, composition_values,
+        'Composition', batch_size
+    )
 
 def main():
     """Main function to orchestrate the import process"""
@@ -225,14 +482,46 @@ def main():
     # Default file path - can be overridden via command line argument
     default_file_path = r"C:\Users\ng\Desktop\washcaresvg\Wash_Care_Symbols_M54\database.xlsx"
     
+    # Options: --stream (constant-memory import), --batch-size N
+    args = sys.argv[1:]
+    stream_mode = '--stream' in args
+    batch_size = DEFAULT_BATCH_SIZE
+    if '--batch-size' in args:
+        batch_size = int(args[args.index('--batch-size') + 1])
+        del args[args.index('--batch-size'):args.index('--batch-size') + 2]
+    args = [arg for arg in args if arg != '--stream']
+    
     # Check if file path provided as argument
-    if len(sys.argv) > 1:
-        excel_file_path = sys.argv[1]
+    if len(args) > 0:
+        excel_file_path = args[0]
     else:
         excel_file_path = default_file_path
     
     print(f"📁 Excel file path: {excel_file_path}")
     
+    if stream_mode:
+        if not os.path.exists(excel_file_path):
+            print(f"❌ Excel file not found: {excel_file_path}")
+            return
+        
+        conn = connect_to_database()
+        if conn is None:
+            print("❌ Failed to connect to database. Exiting.")
+            return
+        
+        try:
+            create_tables_if_not_exist(conn)
+            stream_import(conn, excel_file_path, batch_size)
+            swap_in_shadow_tables(conn, ['shortform', 'composition'])
+            refresh_resolved(conn)
+            print("\n🎉 Streaming import completed successfully!")
+        except Exception as e:
+            print(f"❌ Import process failed: {e}")
+        finally:
+            conn.close()
+            print("🔒 Database connection closed")
+        return
+    
     # Step 1: Read Excel file
     shortform_df, composition_df = read_excel_file(excel_file_path)
     if shortform_df is None or composition_df is None:
@@ -249,12 +538,16 @@ def main():
         # Step 3: Create tables if needed
         create_tables_if_not_exist(conn)
         
-        # Step 4: Import data
+        # Step 4: Import data into shadow tables (live tables stay untouched)
         print("\n📥 Importing ShortForm data...")
-        import_shortform_data(conn, shortform_df)
+        import_shortform_data(conn, shortform_df, create_shadow_table(conn, 'shortform'))
         
         print("\n📥 Importing Composition data...")
-        import_composition_data(conn, composition_df)
+        import_composition_data(conn, composition_df, create_shadow_table(conn, 'composition'))
+        
+        # Step 5: Swap both tables in at once
+        swap_in_shadow_tables(conn, ['shortform', 'composition'])
+        refresh_resolved(conn)
         
         print("\n🎉 Import process completed successfully!")
         print("=" * 50)
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Bulk order-sheet import
+Turns a customer spreadsheet (one row per order line: reference, quantity, composition,
+size, ...) into orders with the same orderData the NewOrderTab writes, in one transaction.
+
+Spreadsheet columns are mapped to the variables declared in the master file's layout
+(variable-enabled Composition Translation and Multi-line Text contents). Columns whose
+header matches a variable's remark are mapped automatically; --map overrides that.
+Rows sharing an order reference become the lines of one order. All rows are validated
+column-wise with pandas; an order with any invalid line is rejected as a whole and every
+problem is written to the error report. The reference becomes the order number (unique in
+the orders table); orders whose reference was imported before are skipped, checked again
+inside the write transaction, so re-running the same sheet - even concurrently - creates
+nothing twice.
+
+Composition cells list "<percentage>% <material>" parts, e.g. "60% Cotton, 40% Polyester".
+
+Usage:
+    py import_order_sheet.py orders.xlsx --master-file-id <id> --supplier-id <id>
+        --layouts exports/localstorage-export.json [--layout-id <id>]
+        [--map "Fibre=Main composition"] [--reference-column "PO"] [--quantity-column "Qty"]
+        [--errors orders_errors.csv] [--dry-run]
+"""
+
+import sqlite3
+import os
+import sys
+import re
+import json
+import random
+import string
+import argparse
+from datetime import datetime, timezone
+
+from order_reports import ensure_order_data_index, order_data_expr, order_data_present
+
+DEFAULT_USER_ID = 'default-user'
+DEFAULT_REFERENCE_COLUMN = 'Order Ref'
+DEFAULT_QUANTITY_COLUMN = 'Quantity'
+REFERENCE_KEY = 'externalOrderRef'  # orderData key holding the customer's order reference
+
+# "60% Cotton" parts, separated by commas, semicolons, slashes or new lines
+COMPOSITION_PART_PATTERN = r'(?P<percentage>\d+(?:\.\d+)?)\s*%\s*(?P<material>[^,;/\n]+)'
+COMPOSITION_CLEANUP_PATTERN = r'\d+(?:\.\d+)?\s*%\s*[^,;/\n]+|[,;/\s]'
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def generate_cuid():
+    """Generate a simple CUID-like ID"""
+    timestamp = str(int(datetime.now().timestamp() * 1000))
+    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return f"c{timestamp}{random_part}"
+
+
+# =====================================================
+# VARIABLE DECLARATIONS
+# =====================================================
+
+def extract_variable_components(objects, region_contents):
+    """Variable-enabled components of a layout, with the ids NewOrderTab uses"""
+    components = []
+
+    def extract_from_region(region):
+        children = region.get('children')
+        if isinstance(children, list) and children:
+            # Region has slices - variables live in the slices only
+            for child in children:
+                extract_from_region(child)
+            return
+        for index, content in enumerate(region_contents.get(region.get('id'), []) or []):
+            for content_type, config_key, kind in (('new-comp-trans', 'newCompTransConfig', 'comp-trans'),
+                                                   ('new-multi-line', 'newMultiLineConfig', 'multi-line')):
+                config = content.get(config_key) or {}
+                if content.get('type') == content_type and config.get('isVariableEnabled'):
+                    components.append({
+                        'id': f"{region.get('id')}_content_{index}",
+                        'type': kind,
+                        'remark': config.get('variableRemark') or '',
+                    })
+
+    for obj in objects:
+        is_child_mother = obj.get('type') == 'mother' and (
+            re.search(r'Mother_\d+[A-Z]', obj.get('name') or '') or obj.get('copiedFrom') or obj.get('isChild'))
+        if is_child_mother:
+            continue
+        for region in obj.get('regions') or []:
+            extract_from_region(region)
+    return components
+
+
+def iter_layouts(value, project_slug=None):
+    """(project slug, layout) from a project_<slug>_layouts value or a whole localStorage dump"""
+    if isinstance(value, list):
+        yield from ((project_slug, layout) for layout in value if isinstance(layout, dict))
+    elif isinstance(value, dict):
+        if 'canvasData' in value:
+            yield project_slug, value
+            return
+        for key, entry in value.items():
+            match = re.fullmatch(r'project_(.+)_layouts', key)
+            if match:
+                if isinstance(entry, str):
+                    entry = json.loads(entry)
+                yield from iter_layouts(entry, match.group(1))
+
+
+def load_layout(layouts_path, master_file_id, layout_id=None):
+    """Pick the layout by id, or the newest layout built on the master file; returns (slug, layout)"""
+    with open(layouts_path, 'r', encoding='utf-8-sig') as f:
+        candidates = list(iter_layouts(json.load(f)))
+    if layout_id:
+        matches = [entry for entry in candidates if entry[1].get('id') == layout_id]
+    else:
+        matches = [entry for entry in candidates if entry[1].get('masterFileId') == master_file_id]
+        matches.sort(key=lambda entry: entry[1].get('updatedAt') or '', reverse=True)
+    if not matches:
+        raise LookupError(f"No layout {'with id ' + layout_id if layout_id else 'for master file ' + master_file_id} "
+                          f"in {layouts_path}")
+    return matches[0]
+
+
+def map_columns(columns, components, reference_column, quantity_column, explicit_map):
+    """Resolve sheet columns: returns (reference, quantity, {column: component})"""
+    by_header = {str(column).strip().lower(): column for column in columns}
+
+    def find_column(name):
+        column = by_header.get(name.strip().lower())
+        if column is None:
+            raise ValueError(f"Column '{name}' not found in the sheet")
+        return column
+
+    def find_component(name):
+        for component in components:
+            if name in (component['id'], component['remark']) or name.lower() == component['remark'].lower():
+                return component
+        raise ValueError(f"'{name}' is not a variable of this layout "
+                         f"(variables: {', '.join(c['remark'] or c['id'] for c in components)})")
+
+    mapping = {}
+    for entry in explicit_map:
+        column_name, _, variable = entry.partition('=')
+        mapping[find_column(column_name)] = find_component(variable.strip())
+    for component in components:
+        column = by_header.get(component['remark'].lower()) if component['remark'] else None
+        if column is not None and column not in mapping and component not in mapping.values():
+            mapping[column] = component
+
+    missing = [c['remark'] or c['id'] for c in components if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"No column mapped to variable(s): {', '.join(missing)} - use --map \"Column=variable\"")
+    return find_column(reference_column), find_column(quantity_column), mapping
+
+
+# =====================================================
+# VALIDATION (vectorized)
+# =====================================================
+
+def validate_rows(df, reference_column, quantity_column, mapping, known_materials):
+    """Validate every row column-wise.
+
+    Returns (valid_df, errors_df, parsed) where parsed[column] holds the composition parts
+    of comp-trans columns (one row per part, indexed by sheet row).
+    """
+    import pandas as pd
+
+    problems = []
+
+    def flag(mask, column, message):
+        if mask.any():
+            problems.append(pd.DataFrame({'row': df.index[mask], 'column': column, 'error': message}))
+
+    references = df[reference_column]
+    flag(references.eq(''), reference_column, 'missing order reference')
+
+    quantities = pd.to_numeric(df[quantity_column], errors='coerce')
+    flag(quantities.isna() | (quantities <= 0) | (quantities % 1 != 0), quantity_column,
+         'quantity must be a positive whole number')
+
+    parsed = {}
+    for column, component in mapping.items():
+        cells = df[column]
+        flag(cells.eq(''), column, 'value is required')
+        if component['type'] != 'comp-trans':
+            continue
+
+        parts = cells.str.extractall(COMPOSITION_PART_PATTERN)
+        parts['material'] = parts['material'].str.strip().str.upper()
+        parts['percentage'] = parts['percentage'].astype(float)
+        parts = parts.droplevel('match')
+        parsed[column] = parts
+
+        leftover = cells.str.replace(COMPOSITION_CLEANUP_PATTERN, '', regex=True)
+        flag(cells.ne('') & leftover.ne(''), column, 'expected "<percentage>% <material>" parts')
+
+        unknown = parts[~parts['material'].isin(known_materials)]
+        if not unknown.empty:
+            names = unknown.groupby(level=0)['material'].agg(', '.join)
+            problems.append(pd.DataFrame({'row': names.index, 'column': column,
+                                          'error': 'unknown material: ' + names.values}))
+
+        totals = parts.groupby(level=0)['percentage'].sum().reindex(df.index, fill_value=0)
+        flag(totals.gt(0) & (totals - 100).abs().gt(0.01), column, 'percentages must add up to 100')
+
+    errors = pd.concat(problems) if problems else pd.DataFrame(columns=['row', 'column', 'error'])
+
+    # A single bad line rejects its whole order
+    bad_references = set(references[errors['row']].unique()) - {''}
+    followers = df.index[references.isin(bad_references) & ~df.index.isin(errors['row'])]
+    if len(followers):
+        errors = pd.concat([errors, pd.DataFrame({'row': followers, 'column': reference_column,
+                                                  'error': 'order rejected: another line is invalid'})])
+
+    valid = df[~df.index.isin(errors['row'])].copy()
+    valid['_quantity'] = quantities[valid.index].astype(int)
+    return valid, errors.sort_values('row'), parsed
+
+
+# =====================================================
+# ORDER CREATION
+# =====================================================
+
+def build_component_variables(row_index, row, mapping, parsed):
+    variables = {}
+    for column, component in mapping.items():
+        if component['type'] == 'comp-trans':
+            parts = parsed[column].loc[[row_index]]
+            data = {'compositions': [{'material': material, 'percentage': f"{percentage:g}"}
+                                     for material, percentage in zip(parts['material'], parts['percentage'])]}
+        else:
+            data = {'textContent': row[column]}
+        variables[component['id']] = {'type': component['type'], 'data': data, 'remark': component['remark']}
+    return variables
+
+
+def build_orders(valid, reference_column, mapping, parsed, context):
+    """One order per reference, lines in sheet order; returns rows for the orders table"""
+    now = datetime.now(timezone.utc)
+    now_ms = int(now.timestamp() * 1000)
+    orders = []
+    for reference, lines in valid.groupby(reference_column, sort=False):
+        order_lines = []
+        for number, (row_index, row) in enumerate(lines.iterrows(), 1):
+            order_lines.append({
+                'id': f"line_{number}",
+                'lineNumber': number,
+                'quantity': int(row['_quantity']),
+                'componentVariables': build_component_variables(row_index, row, mapping, parsed),
+            })
+        total_quantity = sum(line['quantity'] for line in order_lines)
+        order_id = generate_cuid()
+        order_data = {
+            'id': order_id,
+            REFERENCE_KEY: reference,
+            'userOrderNumber': reference,
+            'customerId': context['customerId'],
+            'projectSlug': context['projectSlug'],
+            'layoutId': context['layoutId'],
+            'masterFileId': context['masterFileId'],
+            'masterFileName': context['masterFileName'],
+            'quantity': total_quantity,
+            'orderLines': order_lines,
+            'variableData': order_lines[0]['componentVariables'],
+            'status': context['status'].lower(),
+            'createdAt': now.isoformat().replace('+00:00', 'Z'),
+        }
+        orders.append((order_id, reference, context['status'], total_quantity,
+                       json.dumps(order_data, ensure_ascii=False, separators=(',', ':')),
+                       now_ms, now_ms, context['userId'], context['masterFileId'], context['supplierId']))
+    return orders
+
+
+def find_imported_references(conn, references):
+    """References that already have an order, by orderData reference (expression index)
+    or as order number (unique index)"""
+    found = set()
+    references = list(references)
+    for start in range(0, len(references), 500):
+        chunk = references[start:start + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        found.update(row[0] for row in conn.execute(
+            f'SELECT {order_data_expr(REFERENCE_KEY)} FROM orders '
+            f'WHERE {order_data_present(REFERENCE_KEY)} AND {order_data_expr(REFERENCE_KEY)} IN ({placeholders}) '
+            f'UNION SELECT orderNumber FROM orders WHERE orderNumber IN ({placeholders})', chunk + chunk))
+    return found
+
+
+def insert_orders(conn, orders):
+    """Insert every order in a single transaction; returns the references skipped there.
+
+    The reference check is repeated under the write lock, so an import that finished
+    since the caller's check can't be duplicated.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        imported = find_imported_references(conn, [order[1] for order in orders])
+        conn.executemany('''
+            INSERT INTO orders (id, orderNumber, status, quantity, orderData, createdAt, updatedAt,
+                                userId, masterFileId, supplierId)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [order for order in orders if order[1] not in imported])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return imported
+
+
+def read_sheet(file_path, sheet_name=None):
+    """Read every cell as stripped text; index = spreadsheet row number"""
+    import pandas as pd
+
+    if file_path.lower().endswith('.csv'):
+        df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(file_path, sheet_name=sheet_name or 0, dtype=str, keep_default_na=False)
+    df = df.apply(lambda column: column.str.strip())
+    df.index = df.index + 2  # header is row 1
+    return df
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Import an order spreadsheet')
+    parser.add_argument('sheet', help='Excel or CSV file, one row per order line')
+    parser.add_argument('--master-file-id', required=True, help='Master file the orders are for')
+    parser.add_argument('--supplier-id', required=True, help='Supplier assigned to the orders')
+    parser.add_argument('--layouts', required=True,
+                        help='Layouts JSON: a project_<slug>_layouts export or a full localStorage export')
+    parser.add_argument('--layout-id', help='Layout declaring the variables (default: newest for the master file)')
+    parser.add_argument('--map', action='append', default=[], help='"Column=variable remark or component id"')
+    parser.add_argument('--reference-column', default=DEFAULT_REFERENCE_COLUMN)
+    parser.add_argument('--quantity-column', default=DEFAULT_QUANTITY_COLUMN)
+    parser.add_argument('--sheet-name', help='Worksheet (default: first)')
+    parser.add_argument('--user-id', default=DEFAULT_USER_ID)
+    parser.add_argument('--customer-id', help='Stored in orderData.customerId')
+    parser.add_argument('--status', default='DRAFT', choices=['DRAFT', 'SENT', 'CONFIRMED'])
+    parser.add_argument('--errors', help='Error report CSV (default: <sheet>_errors.csv)')
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--dry-run', action='store_true', help='Validate only')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    db_path = args.db or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        master_file = conn.execute("SELECT id, name FROM master_files WHERE id = ?",
+                                   (args.master_file_id,)).fetchone()
+        if master_file is None:
+            print(f"❌ Master file '{args.master_file_id}' not found")
+            return
+        if not conn.execute("SELECT 1 FROM suppliers WHERE id = ?", (args.supplier_id,)).fetchone():
+            print(f"❌ Supplier '{args.supplier_id}' not found")
+            return
+
+        project_slug, layout = load_layout(args.layouts, args.master_file_id, args.layout_id)
+        components = extract_variable_components((layout.get('canvasData') or {}).get('objects') or [],
+                                                 layout.get('regionContents') or {})
+        print(f"🧩 Layout {layout.get('id')}: {len(components)} variable(s) "
+              f"({', '.join(c['remark'] or c['id'] for c in components)})")
+
+        df = read_sheet(args.sheet, args.sheet_name)
+        reference_column, quantity_column, mapping = map_columns(
+            df.columns, components, args.reference_column, args.quantity_column, args.map)
+        for column, component in mapping.items():
+            print(f"   • {column} → {component['remark'] or component['id']} ({component['type']})")
+
+        known_materials = {row[0].strip().upper() for row in conn.execute(
+            "SELECT DISTINCT material FROM composition WHERE material IS NOT NULL")}
+        valid, errors, parsed = validate_rows(df, reference_column, quantity_column, mapping, known_materials)
+
+        # Only the reference index is needed here; ANALYZE is left to order_reports.py --create-indexes
+        ensure_order_data_index(conn, REFERENCE_KEY)
+        imported = find_imported_references(conn, valid[reference_column].unique())
+        skipped = valid.index[valid[reference_column].isin(imported)]
+        valid = valid[~valid[reference_column].isin(imported)]
+
+        context = {
+            'userId': args.user_id, 'supplierId': args.supplier_id, 'status': args.status,
+            'masterFileId': master_file[0], 'masterFileName': master_file[1],
+            'customerId': args.customer_id or '', 'projectSlug': project_slug or '',
+            'layoutId': layout.get('id'),
+        }
+        orders = build_orders(valid, reference_column, mapping, parsed, context)
+        if orders and not args.dry_run:
+            late = insert_orders(conn, orders)
+            if late:
+                # Imported by someone else between the check above and the write lock
+                skipped = skipped.union(valid.index[valid[reference_column].isin(late)])
+                valid = valid[~valid[reference_column].isin(late)]
+                orders = [order for order in orders if order[1] not in late]
+
+        errors_path = args.errors or os.path.splitext(args.sheet)[0] + '_errors.csv'
+        if not errors.empty:
+            errors.to_csv(errors_path, index=False)
+
+        print(f"\n📊 {len(df)} rows: {len(valid)} imported as {len(orders)} order(s)"
+              f"{' (dry run)' if args.dry_run else ''}, {len(skipped)} already imported, "
+              f"{errors['row'].nunique()} rejected")
+        if not errors.empty:
+            print(f"⚠️ Rejected rows written to {errors_path}")
+    except (OSError, ValueError, LookupError, sqlite3.Error) as e:
+        print(f"❌ Order import failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for browser localStorage exports
+Ingests dumps produced by export-localstorage.js / export-localstorage-universal.html
+(one object of {key: value}, or a single key's value saved as <key>.json) into the
+customers, master_files and orders tables in one pass per table group.
+
+The dump is stream-parsed item by item, rows are de-duplicated against existing rows by
+natural key, and inserts run in batched transactions with a single report at the end.
+
+Usage:
+    py load_localstorage_export.py <dump.json> [<dump.json> ...] --supplier-id <id>
+        [--user-id default-user] [--batch-size 500] [--dry-run] [--report report.json]
+"""
+
+import sqlite3
+import os
+import sys
+import json
+import random
+import string
+import argparse
+from datetime import datetime, timezone
+
+# localStorage keys written by the viewer, by target table
+CUSTOMER_KEYS = ['customers', 'care_label_db_customers']
+MASTER_FILE_KEYS = ['care_label_db_master_files', 'master_files']
+ORDER_KEYS = ['order_management']
+
+ORDER_STATUSES = ['DRAFT', 'SENT', 'CONFIRMED', 'IN_PRODUCTION', 'DELIVERED', 'CANCELLED']
+
+DEFAULT_USER_ID = 'default-user'  # same owner the master-files route uses
+DEFAULT_BATCH_SIZE = 500
+CHUNK_SIZE = 1 << 16
+
+
+# =====================================================
+# STREAMING JSON READER
+# =====================================================
+
+class JsonStream:
+    """Incremental reader for a top-level JSON object or array.
+
+    Only one array item (or one non-array value) is held in memory at a time.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        # Grow geometrically so a single large value is not re-parsed too often
+        chunk = self.f.read(max(CHUNK_SIZE, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self):
+        """Iterate the items of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1}")
+
+    def entries(self):
+        """Iterate (key, value) of the top-level object; array values are lazy iterators"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                iterator = self.items()
+                yield key, iterator
+                for _ in iterator:  # skip whatever the caller did not consume
+                    pass
+            else:
+                yield key, self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' at offset {self.pos - 1}")
+
+
+def iter_dump_entries(file_path):
+    """Yield (localStorage key, iterable of records) from a dump file"""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        stream = JsonStream(f)
+        first = stream.peek()
+        if first == '[':
+            # Single-key download from export-localstorage-universal.html: <key>.json
+            key = os.path.splitext(os.path.basename(file_path))[0]
+            yield key, stream.items()
+        elif first == '{':
+            for key, value in stream.entries():
+                if isinstance(value, str):
+                    # Values localStorage held as raw (unparsed) strings
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        pass
+                if isinstance(value, dict):
+                    value = [value]
+                elif not isinstance(value, list) and not hasattr(value, '__next__'):
+                    value = []  # scalar settings carry no records
+                yield key, value
+        else:
+            raise ValueError(f"{file_path} is not a JSON object or array")
+
+
+# =====================================================
+# ROW MAPPING
+# =====================================================
+
+def generate_cuid():
+    """Generate a simple CUID-like ID"""
+    timestamp = str(int(datetime.now().timestamp() * 1000))
+    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return f"c{timestamp}{random_part}"
+
+
+def to_prisma_datetime(value):
+    """Prisma stores SQLite DateTime as epoch milliseconds"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp() * 1000)
+        except ValueError:
+            pass
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+def text_value(value):
+    """Stripped text for string or numeric dump values; '' for anything else (e.g. objects)"""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return ''
+    return str(value).strip()
+
+
+def customer_key(name):
+    return text_value(name).lower()
+
+
+def map_customer(record):
+    name = text_value(record.get('customerName') or record.get('companyName') or record.get('name'))
+    if not name:
+        return None
+    return {
+        'id': str(record.get('id') or generate_cuid()),
+        'customerName': name,
+        'person': record.get('person') or record.get('contact') or record.get('contactPerson') or '',
+        'email': record.get('email') or '',
+        'tel': record.get('tel') or record.get('phone') or record.get('companyTel') or '',
+        'currency': record.get('currency') or 'USD',
+        'createdAt': to_prisma_datetime(record.get('createdAt')),
+        'updatedAt': to_prisma_datetime(None),  # load time, so the change feed picks the row up
+    }
+
+
+def map_master_file(record, user_id):
+    name = text_value(record.get('name'))
+    if not name:
+        return None
+    width = record.get('width')
+    height = record.get('height')
+    return {
+        'id': str(record.get('id') or generate_cuid()),
+        'name': name,
+        'description': record.get('description'),
+        # Same shape ai-coordinate-viewer/server stores in MasterFile.data
+        'data': json.dumps({'designData': record.get('designData'), 'width': width, 'height': height},
+                           ensure_ascii=False, separators=(',', ':')),
+        'width': width,
+        'height': height,
+        'canvasImage': record.get('canvasImage'),
+        'createdAt': to_prisma_datetime(record.get('createdAt')),
+        'updatedAt': to_prisma_datetime(None),
+        'userId': user_id,
+    }
+
+
+def map_order(record, user_id, supplier_id, master_file_id):
+    status = str(record.get('status') or 'DRAFT').upper().replace(' ', '_')
+    if status not in ORDER_STATUSES:
+        status = 'DRAFT'
+    try:
+        quantity = int(record.get('quantity') or 0)
+    except (TypeError, ValueError):
+        quantity = 0
+    local_id = str(record['id'])
+    return {
+        'id': local_id,
+        # Local order numbers ("001") are only unique per browser; the local id is global
+        'orderNumber': local_id,
+        'status': status,
+        'quantity': max(quantity, 1),
+        'notes': record.get('notes'),
+        'orderData': json.dumps(record, ensure_ascii=False, separators=(',', ':')),
+        'createdAt': to_prisma_datetime(record.get('createdAt')),
+        'updatedAt': to_prisma_datetime(None),
+        'userId': user_id,
+        'masterFileId': master_file_id,
+        'supplierId': supplier_id,
+    }
+
+
+# =====================================================
+# LOADER
+# =====================================================
+
+class BatchWriter:
+    """Buffers rows per table and inserts them in batched transactions"""
+
+    def __init__(self, conn, batch_size, dry_run=False):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.pending = {}
+
+    def add(self, table, row):
+        rows = self.pending.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        tables = [table] if table else list(self.pending)
+        for name in tables:
+            rows = self.pending.pop(name, [])
+            if not rows or self.dry_run:
+                continue
+            columns = list(rows[0].keys())
+            column_list = ', '.join(f'"{c}"' for c in columns)
+            placeholders = ', '.join('?' for _ in columns)
+            sql = f'INSERT INTO "{name}" ({column_list}) VALUES ({placeholders})'
+            with self.conn:
+                self.conn.executemany(sql, [[row[c] for c in columns] for row in rows])
+
+
+class LocalStorageLoader:
+    """Loads localStorage dumps into the Prisma tables"""
+
+    def __init__(self, conn, user_id, supplier_id=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+        self.conn = conn
+        self.user_id = user_id
+        self.supplier_id = supplier_id
+        self.writer = BatchWriter(conn, batch_size, dry_run)
+        self.tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.report = {
+            'customers': {'inserted': 0, 'duplicates': 0, 'invalid': 0},
+            'master_files': {'inserted': 0, 'duplicates': 0, 'invalid': 0},
+            'orders': {'inserted': 0, 'duplicates': 0, 'invalid': 0, 'unknown_master_file': 0},
+            'ignored_keys': {},
+            'errors': [],
+        }
+        self._load_existing_keys()
+
+    def _load_existing_keys(self):
+        """Natural keys already in the database (small compared to the rows themselves)"""
+        self.customer_names = set()
+        self.customer_ids = set()
+        if 'customers' in self.tables:
+            for row_id, name in self.conn.execute("SELECT id, customerName FROM customers"):
+                self.customer_ids.add(row_id)
+                self.customer_names.add(customer_key(name))
+
+        # Master files: local id / name -> database id, so orders can be linked
+        self.master_file_ids = {}
+        self.master_file_names = {}
+        for row_id, name, user_id in self.conn.execute("SELECT id, name, userId FROM master_files"):
+            self.master_file_ids[row_id] = row_id
+            if user_id == self.user_id:
+                self.master_file_names[name.strip().lower()] = row_id
+
+        self.order_ids = set()
+        self.order_numbers = set()
+        for row_id, number in self.conn.execute("SELECT id, orderNumber FROM orders"):
+            self.order_ids.add(row_id)
+            self.order_numbers.add(number)
+
+    def _ignore(self, key):
+        self.report['ignored_keys'][key] = self.report['ignored_keys'].get(key, 0) + 1
+
+    def load_customers(self, records):
+        stats = self.report['customers']
+        if 'customers' not in self.tables:
+            self.report['errors'].append("customers table missing - run 'npx prisma migrate deploy'")
+            return
+        for record in records:
+            row = map_customer(record) if isinstance(record, dict) else None
+            if row is None:
+                stats['invalid'] += 1
+                continue
+            name_key = customer_key(row['customerName'])
+            if name_key in self.customer_names or row['id'] in self.customer_ids:
+                stats['duplicates'] += 1
+                continue
+            self.customer_names.add(name_key)
+            self.customer_ids.add(row['id'])
+            self.writer.add('customers', row)
+            stats['inserted'] += 1
+
+    def load_master_files(self, records):
+        stats = self.report['master_files']
+        for record in records:
+            row = map_master_file(record, self.user_id) if isinstance(record, dict) else None
+            if row is None:
+                stats['invalid'] += 1
+                continue
+            local_id = row['id']
+            name_key = row['name'].lower()
+            existing_id = self.master_file_names.get(name_key) or self.master_file_ids.get(local_id)
+            if existing_id:
+                self.master_file_ids[local_id] = existing_id
+                stats['duplicates'] += 1
+                continue
+            self.master_file_ids[local_id] = local_id
+            self.master_file_names[name_key] = local_id
+            self.writer.add('master_files', row)
+            stats['inserted'] += 1
+
+    def load_orders(self, records):
+        stats = self.report['orders']
+        for record in records:
+            if not isinstance(record, dict) or not record.get('id'):
+                stats['invalid'] += 1
+                continue
+            local_id = str(record['id'])
+            if local_id in self.order_ids or local_id in self.order_numbers:
+                stats['duplicates'] += 1
+                continue
+            master_file_id = (self.master_file_ids.get(str(record.get('masterFileId') or '')) or
+                              self.master_file_names.get(text_value(record.get('masterFileName')).lower()))
+            if not master_file_id:
+                stats['unknown_master_file'] += 1
+                continue
+            self.order_ids.add(local_id)
+            self.order_numbers.add(local_id)
+            self.writer.add('orders', map_order(record, self.user_id, self.supplier_id, master_file_id))
+            stats['inserted'] += 1
+
+    def load(self, file_paths):
+        """Two streaming passes: customers and master files first, then orders that link to them"""
+        for file_path in file_paths:
+            for key, records in iter_dump_entries(file_path):
+                if key in CUSTOMER_KEYS:
+                    self.load_customers(records)
+                elif key in MASTER_FILE_KEYS:
+                    self.load_master_files(records)
+                elif key not in ORDER_KEYS:
+                    self._ignore(key)
+        self.writer.flush()
+
+        for file_path in file_paths:
+            for key, records in iter_dump_entries(file_path):
+                if key not in ORDER_KEYS:
+                    continue
+                if not self.supplier_id:
+                    self.report['errors'].append("orders skipped: pass --supplier-id (orders require a supplier)")
+                    break
+                self.load_orders(records)
+        self.writer.flush()
+        return self.report
+
+
+def connect_to_database(db_path=None):
+    """Connect to the SQLite database"""
+    db_path = db_path or os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return None
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Load localStorage exports into the database')
+    parser.add_argument('files', nargs='+', help='Dump files (all-keys export or <key>.json)')
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--user-id', default=DEFAULT_USER_ID, help='Owner of imported master files and orders')
+    parser.add_argument('--supplier-id', help='Supplier assigned to imported orders')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='Parse and de-duplicate without writing')
+    parser.add_argument('--report', help='Also write the report as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    conn = connect_to_database(args.db)
+    if conn is None:
+        return
+
+    try:
+        if not conn.execute("SELECT 1 FROM users WHERE id = ?", (args.user_id,)).fetchone():
+            print(f"❌ User '{args.user_id}' not found - pass --user-id with an existing user")
+            return
+        if args.supplier_id and not conn.execute("SELECT 1 FROM suppliers WHERE id = ?", (args.supplier_id,)).fetchone():
+            print(f"❌ Supplier '{args.supplier_id}' not found")
+            return
+
+        print(f"📥 Loading {len(args.files)} dump file(s){' (dry run)' if args.dry_run else ''}...")
+        loader = LocalStorageLoader(conn, args.user_id, args.supplier_id, args.batch_size, args.dry_run)
+        report = loader.load(args.files)
+
+        print("\n📊 LOAD REPORT:")
+        for table in ('customers', 'master_files', 'orders'):
+            stats = report[table]
+            details = ', '.join(f"{name} {count}" for name, count in stats.items())
+            print(f"  {table}: {details}")
+        if report['ignored_keys']:
+            print(f"  ignored keys: {', '.join(sorted(report['ignored_keys']))}")
+        for error in report['errors']:
+            print(f"  ⚠️ {error}")
+
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✅ Report written to {args.report}")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ Load failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
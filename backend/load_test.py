@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Load generator and latency benchmark for the washing-care API
+Seeds a local SQLite database with synthetic shortform/composition data at a
+configurable scale, then drives the locally started server with asyncio clients at
+fixed concurrency levels and request mixes. Reports throughput and p50/p95/p99
+latency as JSON.
+
+Usage:
+    py load_test.py seed --db loadtest.db --materials 20000
+    py load_test.py run --concurrency 1,8,32 --duration 15 --output results.json
+    py load_test.py run --db loadtest.db --server-cmd "npm run dev" --concurrency 16
+
+Uses only the standard library (a minimal keep-alive HTTP/1.1 client per virtual user).
+"""
+
+import asyncio
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlsplit, quote
+
+from build_translation_bundles import LANGUAGE_COLUMNS
+
+DEFAULT_BASE_URL = 'http://localhost:3001/api/washing-care'
+
+# Request mix: endpoint name -> relative weight (paths in ENDPOINT_PATHS)
+DEFAULT_MIX = {
+    'shortform': 3,
+    'shortform_search': 2,
+    'composition': 1,
+    'composition_page': 3,
+    'composition_search': 3,
+    'materials_unique': 1,
+}
+
+ENDPOINT_PATHS = {
+    'shortform': '/shortform',
+    'shortform_search': '/shortform/search/{query}',
+    'composition': '/composition',
+    'composition_page': '/composition?limit=50&offset={offset}',
+    'composition_search': '/composition/search/{query}',
+    'materials_unique': '/composition/materials/unique',
+    'stats': '/stats',
+}
+
+MATERIAL_WORDS = [
+    'COTTON', 'POLYESTER', 'ELASTANE', 'VISCOSE', 'NYLON', 'WOOL', 'SILK', 'LINEN',
+    'ACRYLIC', 'POLYAMIDE', 'MODAL', 'BAMBOO', 'CASHMERE', 'ALPACA', 'LYOCELL', 'HEMP'
+]
+DEFAULT_QUERIES = ['COTTON', 'POLY', 'WOOL', 'SILK', 'EN', 'FR', 'ES']
+
+
+# =====================================================
+# SEEDING
+# =====================================================
+
+def seed_database(db_path, materials, shortforms, seed=42):
+    """Create a fresh database with synthetic shortform and composition rows"""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    cursor.execute('''
+        CREATE TABLE "shortform" (
+            "id" TEXT NOT NULL PRIMARY KEY,
+            "symbol" TEXT,
+            "code" TEXT,
+            "name" TEXT,
+            "category" TEXT,
+            "description" TEXT,
+            "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            "updatedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    language_columns_sql = ', '.join(f'"{lang}" TEXT' for lang in LANGUAGE_COLUMNS)
+    cursor.execute(f'''
+        CREATE TABLE "composition" (
+            "id" TEXT NOT NULL PRIMARY KEY,
+            "material" TEXT,
+            {language_columns_sql},
+            "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            "updatedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    now = datetime.now().isoformat()
+    cursor.executemany(
+        'INSERT INTO shortform (id, symbol, code, name, category, description, createdAt, updatedAt) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((f"sf{i:06d}",
+          LANGUAGE_COLUMNS[i % len(LANGUAGE_COLUMNS)].upper() + ('' if i < len(LANGUAGE_COLUMNS) else f" {i}"),
+          LANGUAGE_COLUMNS[i % len(LANGUAGE_COLUMNS)][:2].upper(), '', '', '', now, now)
+         for i in range(shortforms))
+    )
+
+    columns = ['id', 'material'] + LANGUAGE_COLUMNS + ['createdAt', 'updatedAt']
+    placeholders = ', '.join('?' for _ in columns)
+
+    def composition_rows():
+        for i in range(materials):
+            material = f"{rng.choice(MATERIAL_WORDS)} {i:06d}"
+            translations = [f"{material.lower()} ({lang[:2]})" for lang in LANGUAGE_COLUMNS]
+            yield [f"co{i:07d}", material] + translations + [now, now]
+
+    cursor.executemany(f"INSERT INTO composition ({', '.join(columns)}) VALUES ({placeholders})",
+                       composition_rows())
+    conn.commit()
+    conn.close()
+    print(f"✅ Seeded {db_path}: {shortforms} shortform rows, {materials} composition rows")
+
+
+# =====================================================
+# HTTP CLIENT
+# =====================================================
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client (GET only)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.writer = None
+
+    async def get(self, path):
+        """Send a GET and return (status, body_length)"""
+        if self.writer is None:
+            await self._connect()
+        request = (f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                   f"Accept: application/json\r\nConnection: keep-alive\r\n\r\n")
+        self.writer.write(request.encode('ascii'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            length = 0
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                await self.reader.readexactly(size + 2)
+                length += size
+        else:
+            length = int(headers.get('content-length', 0))
+            await self.reader.readexactly(length)
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, length
+
+
+# =====================================================
+# LOAD GENERATION
+# =====================================================
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0,
+        'latency_ms': {
+            'p50': _ms(percentile(latencies, 50)),
+            'p95': _ms(percentile(latencies, 95)),
+            'p99': _ms(percentile(latencies, 99)),
+            'max': _ms(latencies[-1] if latencies else None),
+            'mean': _ms(sum(latencies) / count if count else None),
+        }
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def build_path(base_path, endpoint, rng, queries, offset_max):
+    template = ENDPOINT_PATHS[endpoint]
+    return base_path + template.format(
+        query=quote(rng.choice(queries)),
+        offset=rng.randrange(0, max(offset_max, 1), 50) if offset_max > 50 else 0
+    )
+
+
+async def run_level(host, port, base_path, concurrency, duration, warmup, mix, queries, offset_max, seed):
+    """Run one concurrency level; returns the summary dict"""
+    endpoints = list(mix.keys())
+    weights = [mix[name] for name in endpoints]
+    results = {name: {'latencies': [], 'errors': 0} for name in endpoints}
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def virtual_user(user_id):
+        rng = random.Random(seed * 1000 + user_id)
+        connection = HttpConnection(host, port)
+        try:
+            while time.perf_counter() < stop_at:
+                endpoint = rng.choices(endpoints, weights)[0]
+                path = build_path(base_path, endpoint, rng, queries, offset_max)
+                started = time.perf_counter()
+                try:
+                    status, _ = await connection.get(path)
+                    ok = 200 <= status < 300
+                except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+                    ok = False
+                    await connection.close()
+                finished = time.perf_counter()
+
+                if started < measure_from or finished > stop_at:
+                    continue
+                if ok:
+                    results[endpoint]['latencies'].append(finished - started)
+                else:
+                    results[endpoint]['errors'] += 1
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+
+    all_latencies = [lat for r in results.values() for lat in r['latencies']]
+    all_errors = sum(r['errors'] for r in results.values())
+    summary = {'concurrency': concurrency}
+    summary.update(summarize(all_latencies, all_errors, duration))
+    summary['endpoints'] = {
+        name: summarize(r['latencies'], r['errors'], duration) for name, r in results.items()
+    }
+    return summary
+
+
+async def wait_for_server(host, port, health_path, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        connection = HttpConnection(host, port)
+        try:
+            status, _ = await connection.get(health_path)
+            if status < 500:
+                return True
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            await connection.close()
+        await asyncio.sleep(0.5)
+    return False
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINT_PATHS:
+            raise ValueError(f"Unknown endpoint '{name}', choose from {list(ENDPOINT_PATHS)}")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+async def run_benchmark(args):
+    url = urlsplit(args.url)
+    host = url.hostname or 'localhost'
+    port = url.port or 80
+    base_path = url.path.rstrip('/')
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    queries = args.queries.split(',') if args.queries else DEFAULT_QUERIES
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    if not await wait_for_server(host, port, args.health_path, args.startup_timeout):
+        raise RuntimeError(f"Server not reachable at {host}:{port}{args.health_path}")
+
+    report = {
+        'startedAt': datetime.now().isoformat(),
+        'url': args.url,
+        'duration_s': args.duration,
+        'warmup_s': args.warmup,
+        'mix': mix,
+        'levels': []
+    }
+    for concurrency in levels:
+        print(f"🚀 Concurrency {concurrency} for {args.duration}s...")
+        summary = await run_level(host, port, base_path, concurrency, args.duration, args.warmup,
+                                  mix, queries, args.offset_max, args.seed)
+        latency = summary['latency_ms']
+        print(f"   {summary['throughput_rps']} req/s, p50 {latency['p50']} ms, "
+              f"p95 {latency['p95']} ms, p99 {latency['p99']} ms, errors {summary['errors']}")
+        report['levels'].append(summary)
+    return report
+
+
+def start_server(command, db_path):
+    """Start the API with DATABASE_URL pointing at the given SQLite file.
+
+    The command runs in its own process group, so stop_server() can kill the shell
+    together with the npm/nodemon/node processes it starts.
+    """
+    env = dict(os.environ)
+    if db_path:
+        env['DATABASE_URL'] = 'file:' + os.path.abspath(db_path)
+    if os.name == 'nt':
+        group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {'start_new_session': True}
+    return subprocess.Popen(command, shell=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **group)
+
+
+def stop_server(server):
+    """Kill the server's whole process tree so nothing keeps holding the port"""
+    if server.poll() is None:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(server.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            try:
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(server.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    server.wait()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Washing-care API load test')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed = sub.add_parser('seed', help='Create a synthetic SQLite database')
+    seed.add_argument('--db', default='loadtest.db')
+    seed.add_argument('--materials', type=int, default=10000)
+    seed.add_argument('--shortforms', type=int, default=len(LANGUAGE_COLUMNS))
+    seed.add_argument('--seed', type=int, default=42)
+
+    run = sub.add_parser('run', help='Drive the server and report latency')
+    run.add_argument('--url', default=DEFAULT_BASE_URL)
+    run.add_argument('--health-path', default='/health')
+    run.add_argument('--concurrency', default='1,8,32', help='Comma-separated levels')
+    run.add_argument('--duration', type=float, default=10.0, help='Measured seconds per level')
+    run.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds per level')
+    run.add_argument('--mix', help='e.g. shortform=3,composition_search=2 (default: built-in mix)')
+    run.add_argument('--queries', help='Comma-separated search terms')
+    run.add_argument('--offset-max', type=int, default=10000, help='Upper bound for paged offsets')
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    run.add_argument('--server-cmd', help='Start the server with this command (e.g. "npm run dev")')
+    run.add_argument('--db', help='SQLite file to serve when using --server-cmd')
+    run.add_argument('--startup-timeout', type=float, default=60.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == 'seed':
+        seed_database(args.db, args.materials, args.shortforms, args.seed)
+        return
+
+    if args.db and not args.server_cmd:
+        print("❌ --db only applies when the server is started with --server-cmd")
+        return
+
+    server = start_server(args.server_cmd, args.db) if args.server_cmd else None
+    try:
+        report = asyncio.run(run_benchmark(args))
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ Load test failed: {e}")
+        return
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✅ Report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
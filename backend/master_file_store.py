@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Compressed, lazily loaded storage for MasterFile.data and canvasImage
+Moves large payloads out of master_files into the master_file_blobs side table
+(compressed, keyed by master file id + content hash) and leaves a short reference in
+the original column. Listing and metadata queries then never read blob pages; the
+payload is only inflated when a reader actually asks for it.
+
+Usage:
+    py master_file_store.py migrate [--threshold BYTES] [--batch-size N] [--vacuum]
+    py master_file_store.py restore
+    py master_file_store.py stats
+"""
+
+import sqlite3
+import os
+import sys
+import zlib
+import hashlib
+import argparse
+
+# Payload reference left in master_files.<field>: "@@blob:<sha256>".
+# src/routes/masterFiles.ts resolves the same prefix.
+BLOB_REF_PREFIX = '@@blob:'
+BLOB_FIELDS = ['data', 'canvasImage']
+
+# zlib is used (rather than zstd) so the Express routes can inflate payloads with
+# Node's built-in zlib module; the codec column leaves room for others later
+DEFAULT_CODEC = 'zlib'
+DEFAULT_THRESHOLD = 4096
+DEFAULT_BATCH_SIZE = 50
+
+METADATA_COLUMNS = ['id', 'name', 'description', 'width', 'height', 'userId', 'createdAt', 'updatedAt']
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def connect_to_database(db_path=None):
+    """Connect in WAL mode so the API keeps reading while the migration runs"""
+    db_path = db_path or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return None
+
+    # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def create_blob_table_if_not_exists(conn):
+    """Create master_file_blobs (backup in case the Prisma migration hasn't run)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS "master_file_blobs" (
+            "masterFileId" TEXT NOT NULL,
+            "field" TEXT NOT NULL,
+            "contentHash" TEXT NOT NULL,
+            "codec" TEXT NOT NULL DEFAULT 'zlib',
+            "rawSize" INTEGER NOT NULL,
+            "storedSize" INTEGER NOT NULL,
+            "payload" BLOB NOT NULL,
+            "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+            PRIMARY KEY ("masterFileId", "field"),
+            CONSTRAINT "master_file_blobs_masterFileId_fkey" FOREIGN KEY ("masterFileId") REFERENCES "master_files" ("id") ON DELETE CASCADE ON UPDATE CASCADE
+        )
+    ''')
+
+
+def content_hash(text):
+    """SHA-256 of the uncompressed payload"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_blob_ref(digest):
+    return f"{BLOB_REF_PREFIX}{digest}"
+
+
+def is_blob_ref(value):
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+def compress_payload(text, codec=DEFAULT_CODEC):
+    if codec != 'zlib':
+        raise ValueError(f"Unsupported codec: {codec}")
+    return zlib.compress(text.encode('utf-8'), 9)
+
+
+def decompress_payload(payload, codec):
+    if codec != 'zlib':
+        raise ValueError(f"Unsupported codec: {codec}")
+    return zlib.decompress(payload).decode('utf-8')
+
+
+def migrate_master_files(conn, threshold=DEFAULT_THRESHOLD, batch_size=DEFAULT_BATCH_SIZE):
+    """Move payloads larger than `threshold` bytes into master_file_blobs.
+
+    Runs in short BEGIN IMMEDIATE batches so API writers only ever wait for one batch;
+    readers are never blocked under WAL. Safe to re-run: already moved payloads are
+    skipped, and payloads the API rewrote in plain text are picked up again.
+    """
+    create_blob_table_if_not_exists(conn)
+    moved = 0
+    raw_bytes = 0
+    stored_bytes = 0
+
+    for field in BLOB_FIELDS:
+        last_id = ''
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(f'''
+                    SELECT id, "{field}" FROM master_files
+                    WHERE id > ? AND length("{field}") > ? AND substr("{field}", 1, ?) != ?
+                    ORDER BY id LIMIT ?
+                ''', (last_id, threshold, len(BLOB_REF_PREFIX), BLOB_REF_PREFIX, batch_size)).fetchall()
+
+                for master_file_id, value in rows:
+                    digest = content_hash(value)
+                    payload = compress_payload(value)
+                    conn.execute('''
+                        INSERT OR REPLACE INTO master_file_blobs
+                            (masterFileId, field, contentHash, codec, rawSize, storedSize, payload)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (master_file_id, field, digest, DEFAULT_CODEC,
+                          len(value.encode('utf-8')), len(payload), payload))
+                    conn.execute(f'UPDATE master_files SET "{field}" = ? WHERE id = ?',
+                                 (make_blob_ref(digest), master_file_id))
+                    moved += 1
+                    raw_bytes += len(value.encode('utf-8'))
+                    stored_bytes += len(payload)
+
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1][0]
+            print(f"   • {field}: {moved} payloads moved so far...")
+
+    return moved, raw_bytes, stored_bytes
+
+
+def remove_orphaned_blobs(conn):
+    """Delete blob rows no longer referenced (e.g. the API saved a new plain payload)"""
+    removed = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for field in BLOB_FIELDS:
+            cursor = conn.execute(f'''
+                DELETE FROM master_file_blobs
+                WHERE field = ? AND NOT EXISTS (
+                    SELECT 1 FROM master_files m
+                    WHERE m.id = master_file_blobs.masterFileId
+                      AND m."{field}" = ? || master_file_blobs.contentHash
+                )
+            ''', (field, BLOB_REF_PREFIX))
+            removed += cursor.rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return removed
+
+
+def restore_master_files(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """Inline every blob back into master_files (reverse migration)"""
+    create_blob_table_if_not_exists(conn)
+    restored = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute('''
+                SELECT masterFileId, field, contentHash, codec, payload FROM master_file_blobs
+                ORDER BY masterFileId, field LIMIT ?
+            ''', (batch_size,)).fetchall()
+            for master_file_id, field, digest, codec, payload in rows:
+                if field not in BLOB_FIELDS:
+                    raise ValueError(f"Unknown blob field: {field}")
+                conn.execute(f'UPDATE master_files SET "{field}" = ? WHERE id = ? AND "{field}" = ?',
+                             (decompress_payload(payload, codec), master_file_id, make_blob_ref(digest)))
+                conn.execute("DELETE FROM master_file_blobs WHERE masterFileId = ? AND field = ?",
+                             (master_file_id, field))
+                restored += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if len(rows) < batch_size:
+            return restored
+
+
+class MasterFileStore:
+    """Reader for master files that inflates blob payloads on first access only"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._payloads = {}
+
+    def list_master_files(self):
+        """Metadata for all master files; never reads data/canvasImage"""
+        columns = ', '.join(f'"{c}"' for c in METADATA_COLUMNS)
+        cursor = self.conn.execute(f'SELECT {columns} FROM master_files ORDER BY updatedAt DESC')
+        return [dict(zip(METADATA_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def get_field(self, master_file_id, field):
+        """Return the plain payload for data or canvasImage"""
+        if field not in BLOB_FIELDS:
+            raise ValueError(f"Unknown blob field: {field}")
+
+        row = self.conn.execute(f'SELECT "{field}" FROM master_files WHERE id = ?', (master_file_id,)).fetchone()
+        if row is None:
+            return None
+        value = row[0]
+        if not is_blob_ref(value):
+            return value
+
+        digest = value[len(BLOB_REF_PREFIX):]
+        cache_key = (master_file_id, field, digest)
+        if cache_key not in self._payloads:
+            blob = self.conn.execute('''
+                SELECT codec, payload FROM master_file_blobs
+                WHERE masterFileId = ? AND field = ? AND contentHash = ?
+            ''', (master_file_id, field, digest)).fetchone()
+            if blob is None:
+                raise LookupError(f"Missing blob for master file {master_file_id} ({field})")
+            self._payloads[cache_key] = decompress_payload(blob[1], blob[0])
+        return self._payloads[cache_key]
+
+    def get_data(self, master_file_id):
+        return self.get_field(master_file_id, 'data')
+
+    def get_canvas_image(self, master_file_id):
+        return self.get_field(master_file_id, 'canvasImage')
+
+
+def print_stats(conn):
+    """Show how much of the master file payload lives in the blob table"""
+    create_blob_table_if_not_exists(conn)
+    total = conn.execute("SELECT COUNT(*) FROM master_files").fetchone()[0]
+    print(f"📊 Master files: {total}")
+    for field in BLOB_FIELDS:
+        inline = conn.execute(f'''
+            SELECT COUNT(*), COALESCE(SUM(length("{field}")), 0) FROM master_files
+            WHERE "{field}" IS NOT NULL AND substr("{field}", 1, ?) != ?
+        ''', (len(BLOB_REF_PREFIX), BLOB_REF_PREFIX)).fetchone()
+        stored = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(rawSize), 0), COALESCE(SUM(storedSize), 0)
+            FROM master_file_blobs WHERE field = ?
+        ''', (field,)).fetchone()
+        print(f"  {field}: {inline[0]} inline ({inline[1]} bytes), "
+              f"{stored[0]} compressed ({stored[1]} → {stored[2]} bytes)")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Compressed storage for master file payloads')
+    parser.add_argument('command', choices=['migrate', 'restore', 'stats'])
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help='Only move payloads larger than this many bytes')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Master files per transaction')
+    parser.add_argument('--vacuum', action='store_true',
+                        help='VACUUM afterwards to shrink the file (briefly blocks writers)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    conn = connect_to_database(args.db)
+    if conn is None:
+        return
+
+    try:
+        if args.command == 'migrate':
+            print("📦 Moving large master file payloads into master_file_blobs...")
+            moved, raw_bytes, stored_bytes = migrate_master_files(conn, args.threshold, args.batch_size)
+            removed = remove_orphaned_blobs(conn)
+            print(f"✅ Moved {moved} payloads ({raw_bytes} → {stored_bytes} bytes)")
+            if removed:
+                print(f"🗑️ Removed {removed} orphaned blobs")
+        elif args.command == 'restore':
+            print("📤 Restoring master file payloads inline...")
+            restored = restore_master_files(conn, args.batch_size)
+            print(f"✅ Restored {restored} payloads")
+
+        if args.vacuum:
+            conn.execute("VACUUM")
+            print("✅ Database vacuumed")
+
+        print_stats(conn)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
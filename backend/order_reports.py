@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Indexed order analytics over Order.orderData JSON
+Pushes JSON extraction into SQLite's JSON1 functions, creates expression indexes on
+frequently queried orderData keys and on (status, createdAt), and provides paged and
+streaming report queries.
+"""
+
+import sqlite3
+import os
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime
+
+# orderData keys written by NewOrderTab that reports filter on.
+# Each gets a partial expression index; queries must use order_data_expr() and
+# order_data_present() so the expression and predicate match the index exactly.
+INDEXED_ORDER_DATA_KEYS = ['customerId', 'projectSlug', 'layoutId', 'userOrderNumber', 'externalOrderRef']
+
+ORDER_STATUSES = ['DRAFT', 'SENT', 'CONFIRMED', 'IN_PRODUCTION', 'DELIVERED', 'CANCELLED']
+
+REPORT_COLUMNS = [
+    'id', 'orderNumber', 'status', 'quantity', 'createdAt', 'masterFileId', 'masterFileName',
+    'supplierId', 'supplierName', 'customerName', 'userOrderNumber', 'projectSlug', 'lineCount'
+]
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def connect_to_database(db_path=None):
+    """Connect to the SQLite database and check JSON1 is available"""
+    db_path = db_path or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return None
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("SELECT json_extract('{\"a\":1}', '$.a')").fetchone()
+    except sqlite3.OperationalError:
+        conn.close()
+        print("❌ This SQLite build has no JSON1 support")
+        return None
+    return conn
+
+
+def order_data_expr(key):
+    """SQL expression for an orderData key (must match the index definition)"""
+    return f"json_extract(orderData, '$.{key}')"
+
+
+def order_data_present(key, alias=''):
+    """Partial-index predicate for an orderData key; queries repeat it so the index applies.
+
+    json_valid() comes first so malformed orderData never reaches json_extract().
+    """
+    column = f'{alias}.orderData' if alias else 'orderData'
+    return f"json_valid({column}) AND json_extract({column}, '$.{key}') IS NOT NULL"
+
+
+def ensure_order_data_index(conn, key):
+    """Create the partial expression index for one orderData key (no ANALYZE)"""
+    name = f'orders_orderData_{key}_idx'
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+    if row is not None and 'IS NOT NULL' not in row[0]:
+        # Earlier versions indexed every valid row, including the many without this key
+        conn.execute(f'DROP INDEX "{name}"')
+    # Only rows that have the key are indexed: the index stays small and its statistics
+    # reflect the rows that can actually match
+    conn.execute(
+        f'CREATE INDEX IF NOT EXISTS "{name}" '
+        f'ON "orders"({order_data_expr(key)}, "createdAt") WHERE {order_data_present(key)}'
+    )
+
+
+def ensure_report_indexes(conn):
+    """Create the indexes used by the report queries and refresh their statistics (idempotent)"""
+    statements = [
+        'CREATE INDEX IF NOT EXISTS "orders_status_createdAt_idx" ON "orders"("status", "createdAt")',
+        'CREATE INDEX IF NOT EXISTS "orders_masterFileId_status_createdAt_idx" '
+        'ON "orders"("masterFileId", "status", "createdAt")',
+    ]
+    for statement in statements:
+        conn.execute(statement)
+    for key in INDEXED_ORDER_DATA_KEYS:
+        ensure_order_data_index(conn, key)
+    conn.execute("ANALYZE orders")
+    conn.commit()
+    return len(statements) + len(INDEXED_ORDER_DATA_KEYS)
+
+
+def _timestamp_param(conn, value):
+    """Convert a datetime/ISO string to the storage format used by orders.createdAt.
+
+    Prisma stores DateTime as epoch milliseconds, rows written by our Python scripts
+    use ISO text; compare in whichever format the table actually holds so the
+    (status, createdAt) index stays usable.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+
+    row = conn.execute("SELECT typeof(createdAt) FROM orders LIMIT 1").fetchone()
+    if row is not None and row[0] == 'integer':
+        return int(value.timestamp() * 1000)
+    return value.isoformat()
+
+
+def _build_where(conn, status=None, master_file_id=None, since=None, until=None,
+                 material=None, order_data_filters=None):
+    """Build the WHERE clause and parameters shared by all report queries"""
+    clauses = []
+    params = []
+
+    if status:
+        statuses = [status] if isinstance(status, str) else list(status)
+        clauses.append(f"o.status IN ({', '.join('?' for _ in statuses)})")
+        params.extend(statuses)
+    if master_file_id:
+        clauses.append("o.masterFileId = ?")
+        params.append(master_file_id)
+    if since is not None:
+        clauses.append("o.createdAt >= ?")
+        params.append(_timestamp_param(conn, since))
+    if until is not None:
+        clauses.append("o.createdAt < ?")
+        params.append(_timestamp_param(conn, until))
+
+    if material and not order_data_filters:
+        clauses.append("json_valid(o.orderData)")
+    for key, value in (order_data_filters or {}).items():
+        if key not in INDEXED_ORDER_DATA_KEYS:
+            raise ValueError(f"orderData key '{key}' is not indexed; use one of {INDEXED_ORDER_DATA_KEYS}")
+        clauses.append(order_data_present(key, 'o'))
+        clauses.append(f"json_extract(o.orderData, '$.{key}') = ?")
+        params.append(value)
+
+    if material:
+        # Compositions live at orderLines[*].componentVariables[*].data.compositions[*].material,
+        # which no index can cover; the indexed predicates above narrow the rows first
+        clauses.append(
+            "EXISTS (SELECT 1 FROM json_tree(o.orderData, '$.orderLines') t "
+            "WHERE t.key = 'material' AND upper(t.value) = upper(?))"
+        )
+        params.append(material)
+
+    where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    return where, params
+
+
+def _select_sql(where, extra=''):
+    return f'''
+        SELECT o.id, o.orderNumber, o.status, o.quantity, o.createdAt,
+               o.masterFileId, m.name AS masterFileName,
+               o.supplierId, s.name AS supplierName,
+               CASE WHEN json_valid(o.orderData) THEN json_extract(o.orderData, '$.customerName') END AS customerName,
+               CASE WHEN json_valid(o.orderData) THEN json_extract(o.orderData, '$.userOrderNumber') END AS userOrderNumber,
+               CASE WHEN json_valid(o.orderData) THEN json_extract(o.orderData, '$.projectSlug') END AS projectSlug,
+               CASE WHEN json_valid(o.orderData) THEN json_array_length(o.orderData, '$.orderLines') END AS lineCount
+        FROM orders o
+        LEFT JOIN master_files m ON m.id = o.masterFileId
+        LEFT JOIN suppliers s ON s.id = o.supplierId
+        {where}
+        {extra}
+    '''
+
+
+def iter_orders(conn, batch_size=500, **filters):
+    """Stream matching orders (newest first) as dicts without loading the full result"""
+    where, params = _build_where(conn, **filters)
+    cursor = conn.execute(_select_sql(where, 'ORDER BY o.createdAt DESC, o.id DESC'), params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield dict(row)
+
+
+def fetch_order_page(conn, page_size=50, after=None, **filters):
+    """Fetch one page of orders using keyset pagination.
+
+    `after` is the cursor returned by the previous page, so deep pages cost the same
+    as the first one (no OFFSET scan). Returns (rows, next_cursor).
+    """
+    where, params = _build_where(conn, **filters)
+    if after:
+        created_at, order_id = json.loads(after)
+        keyset = "(o.createdAt < ? OR (o.createdAt = ? AND o.id < ?))"
+        where = (where + ' AND ' + keyset) if where else ('WHERE ' + keyset)
+        params.extend([created_at, created_at, order_id])
+
+    rows = [dict(row) for row in conn.execute(
+        _select_sql(where, 'ORDER BY o.createdAt DESC, o.id DESC LIMIT ?'), params + [page_size]
+    )]
+    next_cursor = None
+    if len(rows) == page_size:
+        last = rows[-1]
+        next_cursor = json.dumps([last['createdAt'], last['id']])
+    return rows, next_cursor
+
+
+def status_summary(conn, **filters):
+    """Order count and total quantity per status"""
+    where, params = _build_where(conn, **filters)
+    cursor = conn.execute(f'''
+        SELECT o.status, COUNT(*) AS orders, COALESCE(SUM(o.quantity), 0) AS quantity
+        FROM orders o
+        {where}
+        GROUP BY o.status
+        ORDER BY o.status
+    ''', params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def export_orders_csv(conn, output_path, **filters):
+    """Stream a report straight to CSV, returns the number of rows written"""
+    count = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for row in iter_orders(conn, **filters):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Order analytics over Order.orderData')
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--create-indexes', action='store_true', help='Create/refresh report indexes')
+    parser.add_argument('--status', action='append', choices=ORDER_STATUSES, help='Filter by status (repeatable)')
+    parser.add_argument('--master-file', help='Filter by master file id')
+    parser.add_argument('--material', help='Filter by composition material (e.g. COTTON)')
+    parser.add_argument('--since', help='Created at or after (ISO date)')
+    parser.add_argument('--until', help='Created before (ISO date)')
+    parser.add_argument('--customer', help='Filter by orderData.customerId')
+    parser.add_argument('--page-size', type=int, default=50, help='Rows per page when printing')
+    parser.add_argument('--after', help='Cursor returned by the previous page')
+    parser.add_argument('--csv', help='Stream all matching rows to this CSV file')
+    parser.add_argument('--summary', action='store_true', help='Show counts per status')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    conn = connect_to_database(args.db)
+    if conn is None:
+        return
+
+    try:
+        if args.create_indexes:
+            created = ensure_report_indexes(conn)
+            print(f"✅ {created} report indexes created/verified")
+
+        filters = {
+            'status': args.status,
+            'master_file_id': args.master_file,
+            'material': args.material,
+            'since': args.since,
+            'until': args.until,
+            'order_data_filters': {'customerId': args.customer} if args.customer else None
+        }
+
+        if args.summary:
+            print("📊 ORDERS BY STATUS:")
+            for row in status_summary(conn, **filters):
+                print(f"  {row['status']}: {row['orders']} orders, quantity {row['quantity']}")
+
+        if args.csv:
+            count = export_orders_csv(conn, args.csv, **filters)
+            print(f"✅ Exported {count} orders to {args.csv}")
+        elif not args.summary or args.after:
+            rows, next_cursor = fetch_order_page(conn, page_size=args.page_size, after=args.after, **filters)
+            print(f"📋 {len(rows)} orders:")
+            for row in rows:
+                print(f"  {row['orderNumber']} | {row['status']} | {row['createdAt']} | "
+                      f"{row['masterFileName']} | qty {row['quantity']} | {row['customerName'] or ''}")
+            if next_cursor:
+                print(f"\n➡️ Next page: --after '{next_cursor}'")
+
+    except (sqlite3.Error, ValueError) as e:
+        print(f"❌ Report query failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+-- CreateIndex
+CREATE INDEX "orders_status_createdAt_idx" ON "orders"("status", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "orders_masterFileId_status_createdAt_idx" ON "orders"("masterFileId", "status", "createdAt");
@@ -0,0 +1,14 @@
+-- CreateTable
+CREATE TABLE "master_file_blobs" (
+    "masterFileId" TEXT NOT NULL,
+    "field" TEXT NOT NULL,
+    "contentHash" TEXT NOT NULL,
+    "codec" TEXT NOT NULL DEFAULT 'zlib',
+    "rawSize" INTEGER NOT NULL,
+    "storedSize" INTEGER NOT NULL,
+    "payload" BLOB NOT NULL,
+    "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY ("masterFileId", "field"),
+    CONSTRAINT "master_file_blobs_masterFileId_fkey" FOREIGN KEY ("masterFileId") REFERENCES "master_files" ("id") ON DELETE CASCADE ON UPDATE CASCADE
+);
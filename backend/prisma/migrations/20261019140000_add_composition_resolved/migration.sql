@@ -0,0 +1,25 @@
+-- CreateTable
+CREATE TABLE "composition_resolved" (
+    "material" TEXT NOT NULL PRIMARY KEY,
+    "spanish" TEXT NOT NULL,
+    "french" TEXT NOT NULL,
+    "english" TEXT NOT NULL,
+    "portuguese" TEXT NOT NULL,
+    "dutch" TEXT NOT NULL,
+    "italian" TEXT NOT NULL,
+    "greek" TEXT NOT NULL,
+    "japanese" TEXT NOT NULL,
+    "german" TEXT NOT NULL,
+    "danish" TEXT NOT NULL,
+    "slovenian" TEXT NOT NULL,
+    "chinese" TEXT NOT NULL,
+    "korean" TEXT NOT NULL,
+    "indonesian" TEXT NOT NULL,
+    "arabic" TEXT NOT NULL,
+    "galician" TEXT NOT NULL,
+    "catalan" TEXT NOT NULL,
+    "basque" TEXT NOT NULL,
+    "fallbackMask" INTEGER NOT NULL DEFAULT 0,
+    "sourceHash" TEXT NOT NULL,
+    "refreshedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,64 @@
+-- CreateTable
+CREATE TABLE "change_tombstones" (
+    "seq" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "tableName" TEXT NOT NULL,
+    "rowKey" TEXT NOT NULL,
+    "deletedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- CreateIndex
+CREATE INDEX "shortform_updatedAt_idx" ON "shortform"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "composition_updatedAt_idx" ON "composition"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "composition_resolved_refreshedAt_idx" ON "composition_resolved"("refreshedAt");
+
+-- CreateIndex
+CREATE INDEX "customers_updatedAt_idx" ON "customers"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "suppliers_updatedAt_idx" ON "suppliers"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "master_files_updatedAt_idx" ON "master_files"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "orders_updatedAt_idx" ON "orders"("updatedAt");
+
+-- Tombstone triggers (not expressible in schema.prisma)
+CREATE TRIGGER "shortform_tombstone" AFTER DELETE ON "shortform"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('shortform', OLD."id");
+END;
+
+CREATE TRIGGER "composition_tombstone" AFTER DELETE ON "composition"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('composition', OLD."id");
+END;
+
+CREATE TRIGGER "composition_resolved_tombstone" AFTER DELETE ON "composition_resolved"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('composition_resolved', OLD."material");
+END;
+
+CREATE TRIGGER "customers_tombstone" AFTER DELETE ON "customers"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('customers', OLD."id");
+END;
+
+CREATE TRIGGER "suppliers_tombstone" AFTER DELETE ON "suppliers"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('suppliers', OLD."id");
+END;
+
+CREATE TRIGGER "master_files_tombstone" AFTER DELETE ON "master_files"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('master_files', OLD."id");
+END;
+
+CREATE TRIGGER "orders_tombstone" AFTER DELETE ON "orders"
+BEGIN
+    INSERT INTO "change_tombstones" ("tableName", "rowKey") VALUES ('orders', OLD."id");
+END;
@@ -0,0 +1,21 @@
+-- CreateTable
+CREATE TABLE "revision_objects" (
+    "hash" TEXT NOT NULL PRIMARY KEY,
+    "body" TEXT NOT NULL,
+    "size" INTEGER NOT NULL
+);
+
+-- CreateTable
+CREATE TABLE "master_file_revisions" (
+    "masterFileId" TEXT NOT NULL,
+    "revision" INTEGER NOT NULL,
+    "contentHash" TEXT NOT NULL,
+    "skeletonHash" TEXT NOT NULL,
+    "baseRevision" INTEGER,
+    "refs" TEXT NOT NULL,
+    "objectCount" INTEGER NOT NULL,
+    "rawSize" INTEGER NOT NULL,
+    "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY ("masterFileId", "revision")
+);
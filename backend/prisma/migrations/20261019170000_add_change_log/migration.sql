@@ -0,0 +1,95 @@
+-- CreateTable
+CREATE TABLE "change_log" (
+    "seq" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "tableName" TEXT NOT NULL,
+    "rowKey" TEXT NOT NULL,
+    "changedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "change_log_tableName_rowKey_key" ON "change_log"("tableName", "rowKey");
+
+-- Change log triggers (not expressible in schema.prisma)
+CREATE TRIGGER "shortform_change_log_insert" AFTER INSERT ON "shortform"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'shortform' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('shortform', NEW."id");
+END;
+
+CREATE TRIGGER "shortform_change_log_update" AFTER UPDATE ON "shortform"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'shortform' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('shortform', NEW."id");
+END;
+
+CREATE TRIGGER "composition_change_log_insert" AFTER INSERT ON "composition"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'composition' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('composition', NEW."id");
+END;
+
+CREATE TRIGGER "composition_change_log_update" AFTER UPDATE ON "composition"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'composition' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('composition', NEW."id");
+END;
+
+CREATE TRIGGER "composition_resolved_change_log_insert" AFTER INSERT ON "composition_resolved"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'composition_resolved' AND "rowKey" = NEW."material";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('composition_resolved', NEW."material");
+END;
+
+CREATE TRIGGER "composition_resolved_change_log_update" AFTER UPDATE ON "composition_resolved"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'composition_resolved' AND "rowKey" = NEW."material";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('composition_resolved', NEW."material");
+END;
+
+CREATE TRIGGER "customers_change_log_insert" AFTER INSERT ON "customers"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'customers' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('customers', NEW."id");
+END;
+
+CREATE TRIGGER "customers_change_log_update" AFTER UPDATE ON "customers"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'customers' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('customers', NEW."id");
+END;
+
+CREATE TRIGGER "suppliers_change_log_insert" AFTER INSERT ON "suppliers"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'suppliers' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('suppliers', NEW."id");
+END;
+
+CREATE TRIGGER "suppliers_change_log_update" AFTER UPDATE ON "suppliers"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'suppliers' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('suppliers', NEW."id");
+END;
+
+CREATE TRIGGER "master_files_change_log_insert" AFTER INSERT ON "master_files"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'master_files' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('master_files', NEW."id");
+END;
+
+CREATE TRIGGER "master_files_change_log_update" AFTER UPDATE ON "master_files"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'master_files' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('master_files', NEW."id");
+END;
+
+CREATE TRIGGER "orders_change_log_insert" AFTER INSERT ON "orders"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'orders' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('orders', NEW."id");
+END;
+
+CREATE TRIGGER "orders_change_log_update" AFTER UPDATE ON "orders"
+BEGIN
+    DELETE FROM "change_log" WHERE "tableName" = 'orders' AND "rowKey" = NEW."id";
+    INSERT INTO "change_log" ("tableName", "rowKey") VALUES ('orders', NEW."id");
+END;
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Incremental replication between the backend and viewer-server SQLite databases
+Copies chosen tables (translations and customers by default) from backend/prisma/dev.db
+into ai-coordinate-viewer/server/prisma/dev.db, or between any two database files.
+
+`init` takes a consistent snapshot of the source with SQLite's online backup API in a single
+step (in WAL mode writers are not blocked) and copies the chosen tables from it into the
+target. `sync` then applies only what changed since the previous run, read from the change
+feed (change log + tombstones, see change_feed.py), in short batched transactions. Both servers stay online;
+the replication cursor is stored in the target and only advanced with the last batch, so an
+interrupted sync is simply applied again.
+
+Usage:
+    py replicate_databases.py init [--source DB] [--target DB] [--tables composition_resolved,customers]
+    py replicate_databases.py sync [--source DB] [--target DB] [--batch-size 500]
+    py replicate_databases.py status [--target DB]
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+from change_feed import TRACKED_TABLES, ensure_change_tracking, current_cursor, get_changes
+
+DEFAULT_TABLES = ['shortform', 'composition', 'composition_resolved', 'customers']
+DEFAULT_BATCH_SIZE = 500
+STATE_TABLE = 'replication_state'
+
+
+def get_default_source():
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def get_default_target():
+    return os.path.join(os.path.dirname(__file__), '..', 'ai-coordinate-viewer', 'server', 'prisma', 'dev.db')
+
+
+def connect(db_path):
+    """Autocommit connection in WAL mode; transactions are opened explicitly"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def create_state_table_if_not_exists(conn):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{STATE_TABLE}" (
+            "source" TEXT NOT NULL PRIMARY KEY,
+            "tables" TEXT NOT NULL,
+            "cursor" TEXT NOT NULL,
+            "syncedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def save_state(conn, source, tables, cursor):
+    conn.execute(f'''
+        INSERT OR REPLACE INTO "{STATE_TABLE}" (source, tables, cursor, syncedAt)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (source, ','.join(tables), cursor))
+
+
+def load_state(conn, source):
+    create_state_table_if_not_exists(conn)
+    row = conn.execute(f'SELECT tables, cursor FROM "{STATE_TABLE}" WHERE source = ?', (source,)).fetchone()
+    if row is None:
+        return None, None
+    return row[0].split(','), row[1]
+
+
+def snapshot_source(source_conn, directory):
+    """Copy the whole source database to a temporary file with the online backup API"""
+    fd, snapshot_path = tempfile.mkstemp(suffix='.db', prefix='replication-', dir=directory)
+    os.close(fd)
+    snapshot = sqlite3.connect(snapshot_path)
+    try:
+        # One step: a stepped backup restarts whenever another connection writes to the
+        # source, so with the API writing steadily it might never finish. In WAL mode the
+        # single read transaction does not block writers.
+        source_conn.backup(snapshot, pages=-1)
+    finally:
+        snapshot.close()
+    return snapshot_path
+
+
+def initial_copy(source_conn, target_conn, source_key, tables, snapshot_dir=None):
+    """Replace the chosen tables in the target with a snapshot of the source.
+
+    Each table is swapped in its own transaction, so target readers see either the old or
+    the complete new table. Returns rows copied per table.
+    """
+    ensure_change_tracking(source_conn)
+    snapshot_path = snapshot_source(source_conn, snapshot_dir)
+    copied = {}
+    try:
+        # The cursor comes from the snapshot itself, so no change is lost or applied twice
+        snapshot = sqlite3.connect(snapshot_path)
+        try:
+            cursor = current_cursor(snapshot, tables)
+        finally:
+            snapshot.close()
+
+        target_conn.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
+        create_state_table_if_not_exists(target_conn)
+
+        for table in tables:
+            schema_sqls = [row[0] for row in target_conn.execute(
+                "SELECT sql FROM snapshot.sqlite_master WHERE tbl_name = ? AND type IN ('table', 'index') "
+                "AND sql IS NOT NULL ORDER BY type = 'index'", (table,))]
+            if not schema_sqls:
+                print(f"⚠️ {table} does not exist in the source, skipped")
+                continue
+
+            target_conn.execute("BEGIN IMMEDIATE")
+            try:
+                target_conn.execute(f'DROP TABLE IF EXISTS main."{table}"')
+                for schema_sql in schema_sqls:
+                    target_conn.execute(schema_sql)
+                target_conn.execute(f'INSERT INTO main."{table}" SELECT * FROM snapshot."{table}"')
+                copied[table] = target_conn.execute(f'SELECT COUNT(*) FROM main."{table}"').fetchone()[0]
+                target_conn.execute("COMMIT")
+            except Exception:
+                target_conn.execute("ROLLBACK")
+                raise
+
+        target_conn.execute("BEGIN IMMEDIATE")
+        save_state(target_conn, source_key, tables, cursor)
+        target_conn.execute("COMMIT")
+    finally:
+        try:
+            target_conn.execute("DETACH DATABASE snapshot")
+        except sqlite3.Error:
+            pass
+        os.remove(snapshot_path)
+    return copied
+
+
+def apply_changes(target_conn, bundle, source_key, tables, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply a change-feed bundle in batched transactions, saving the cursor with the last one"""
+    statements = []
+    for table, keys in bundle['deleted'].items():
+        key_column = TRACKED_TABLES[table][0]
+        sql = f'DELETE FROM "{table}" WHERE "{key_column}" = ?'
+        statements.extend((sql, (key,)) for key in keys)
+    for table, change in bundle['changes'].items():
+        columns = ', '.join(f'"{c}"' for c in change['columns'])
+        placeholders = ', '.join('?' for _ in change['columns'])
+        sql = f'INSERT OR REPLACE INTO "{table}" ({columns}) VALUES ({placeholders})'
+        statements.extend((sql, row) for row in change['rows'])
+
+    # Deletes come first, and the batches keep that order
+    batches = [statements[i:i + batch_size] for i in range(0, len(statements), batch_size)] or [[]]
+    for number, batch in enumerate(batches, 1):
+        target_conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in batch:
+                target_conn.execute(sql, params)
+            if number == len(batches):
+                save_state(target_conn, source_key, tables, bundle['cursor'])
+            target_conn.execute("COMMIT")
+        except Exception:
+            target_conn.execute("ROLLBACK")
+            raise
+    return len(statements), len(batches)
+
+
+def sync(source_conn, target_conn, source_key, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply source changes since the last init/sync; returns (statements, batches, bundle)"""
+    tables, cursor = load_state(target_conn, source_key)
+    if cursor is None:
+        raise LookupError("No replication state for this source - run 'init' first")
+    bundle = get_changes(source_conn, cursor, tables)
+    statements, batches = apply_changes(target_conn, bundle, source_key, tables, batch_size)
+    return statements, batches, bundle
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Replicate tables between SQLite databases')
+    parser.add_argument('command', choices=['init', 'sync', 'status'])
+    parser.add_argument('--source', default=get_default_source(), help='Source database (default: backend)')
+    parser.add_argument('--target', default=get_default_target(), help='Target database (default: viewer server)')
+    parser.add_argument('--tables', default=','.join(DEFAULT_TABLES), help='Comma-separated tables for init')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Row changes per transaction')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    for path in (args.source, args.target):
+        if not os.path.exists(path):
+            print(f"❌ Database not found at: {path}")
+            return
+    source_key = os.path.abspath(args.source)
+
+    source_conn = connect(args.source)
+    target_conn = connect(args.target)
+    try:
+        started = time.time()
+        if args.command == 'init':
+            tables = args.tables.split(',')
+            unknown = [table for table in tables if table not in TRACKED_TABLES]
+            if unknown:
+                print(f"❌ Not a replicable table: {', '.join(unknown)} (choose from {', '.join(TRACKED_TABLES)})")
+                return
+            print(f"📸 Snapshotting {args.source} and copying {', '.join(tables)}...")
+            # Snapshot next to the target so the final copy stays on one disk
+            snapshot_dir = os.path.dirname(os.path.abspath(args.target))
+            copied = initial_copy(source_conn, target_conn, source_key, tables, snapshot_dir)
+            for table, count in copied.items():
+                print(f"  {table}: {count} rows")
+            print(f"✅ Initial copy finished in {time.time() - started:.2f}s")
+
+        elif args.command == 'sync':
+            statements, batches, bundle = sync(source_conn, target_conn, source_key, args.batch_size)
+            for table, change in bundle['changes'].items():
+                print(f"  {table}: {len(change['rows'])} upserted")
+            for table, keys in bundle['deleted'].items():
+                print(f"  {table}: {len(keys)} deleted")
+            print(f"✅ Applied {statements} changes in {batches} transaction(s) "
+                  f"({time.time() - started:.2f}s)")
+
+        else:
+            create_state_table_if_not_exists(target_conn)
+            rows = target_conn.execute(f'SELECT source, tables, syncedAt FROM "{STATE_TABLE}"').fetchall()
+            if not rows:
+                print("ℹ️ Target has no replication state yet")
+            for source, tables, synced_at in rows:
+                print(f"🔁 {source}\n   tables: {tables}\n   last sync: {synced_at}")
+    except (OSError, ValueError, LookupError, sqlite3.Error) as e:
+        print(f"❌ {args.command} failed: {e}")
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Materialized, fallback-resolved composition translations
+Maintains composition_resolved: one row per material with every language filled in.
+Empty cells are resolved through a per-language fallback chain (e.g. galician → spanish →
+english), then material.lower() as before, and fallbackMask records which cells were filled
+that way. Readers do a single indexed lookup instead of resolving cells on every call.
+
+The refresh is incremental: each material's source cells and the chain configuration are
+hashed, and only materials whose hash changed are rewritten (removed materials are deleted).
+It therefore also works after the Excel import has swapped in a freshly built table.
+The import refreshes the table itself; readers only refresh it when materials are missing
+(e.g. right after the Prisma migration created it empty).
+
+Usage:
+    py resolved_translations.py refresh [--chains translation_fallbacks.json] [--full]
+    py resolved_translations.py show BAMBOO CASHMERE
+"""
+
+import sqlite3
+import os
+import sys
+import json
+import hashlib
+import argparse
+from itertools import groupby
+
+from build_translation_bundles import LANGUAGE_COLUMNS
+
+# Languages tried, in order, when a language's own cell is empty. Languages not listed
+# fall back to DEFAULT_CHAIN. Override with translation_fallbacks.json ("*" sets the default).
+FALLBACK_CHAINS = {
+    'galician': ['spanish', 'english'],
+    'catalan': ['spanish', 'english'],
+    'basque': ['spanish', 'english'],
+    'portuguese': ['spanish', 'english'],
+}
+DEFAULT_CHAIN = ['english']
+
+RESOLVED_TABLE = 'composition_resolved'
+FALLBACK_CONFIG_NAME = 'translation_fallbacks.json'
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def get_default_config_path():
+    return os.path.join(os.path.dirname(__file__), FALLBACK_CONFIG_NAME)
+
+
+def load_fallback_chains(config_path=None):
+    """Fallback chain per language: built-in defaults, overridden by the JSON config if present"""
+    overrides = {}
+    config_path = config_path or get_default_config_path()
+    if os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+
+    default = overrides.pop('*', DEFAULT_CHAIN)
+    chains = {lang: overrides.get(lang, FALLBACK_CHAINS.get(lang, default)) for lang in LANGUAGE_COLUMNS}
+
+    unknown_languages = [lang for lang in overrides if lang not in LANGUAGE_COLUMNS]
+    if unknown_languages:
+        raise ValueError(f"Unknown language in fallback config: {', '.join(unknown_languages)}")
+    for lang, chain in chains.items():
+        unknown = [name for name in chain if name not in LANGUAGE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown language in fallback chain for {lang}: {', '.join(unknown)}")
+    # A language never falls back to itself
+    return {lang: [name for name in chains[lang] if name != lang] for lang in LANGUAGE_COLUMNS}
+
+
+def chains_signature(chains):
+    """Stable text form of the configuration, part of every row hash"""
+    return json.dumps([chains[lang] for lang in LANGUAGE_COLUMNS], separators=(',', ':'))
+
+
+def create_resolved_table_if_not_exists(conn):
+    """Create composition_resolved (backup in case the Prisma migration hasn't run)"""
+    language_columns = ',\n'.join(f'            "{lang}" TEXT NOT NULL' for lang in LANGUAGE_COLUMNS)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{RESOLVED_TABLE}" (
+            "material" TEXT NOT NULL PRIMARY KEY,
+{language_columns},
+            "fallbackMask" INTEGER NOT NULL DEFAULT 0,
+            "sourceHash" TEXT NOT NULL,
+            "refreshedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def merge_source_rows(rows):
+    """Combine duplicate composition rows of one material: first non-empty cell wins"""
+    merged = [None] * len(LANGUAGE_COLUMNS)
+    for row in rows:
+        for i, value in enumerate(row):
+            if merged[i] is None and value is not None and str(value).strip():
+                merged[i] = str(value)
+    return merged
+
+
+def resolve_cells(material, cells, chains):
+    """Fill empty cells through the fallback chains, returns (values, fallbackMask)"""
+    by_language = dict(zip(LANGUAGE_COLUMNS, cells))
+    values = []
+    mask = 0
+    for i, lang in enumerate(LANGUAGE_COLUMNS):
+        value = by_language[lang]
+        if value is None:
+            mask |= 1 << i
+            value = next((by_language[name] for name in chains[lang] if by_language[name] is not None),
+                         material.lower())
+        values.append(value)
+    return values, mask
+
+
+def fallback_languages(mask):
+    """Languages whose value was filled by fallback, from a fallbackMask"""
+    return [lang for i, lang in enumerate(LANGUAGE_COLUMNS) if mask & (1 << i)]
+
+
+def source_hash(signature, material, cells):
+    payload = json.dumps([signature, material, cells], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def refresh_resolved_translations(conn, chains=None, full=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Bring composition_resolved up to date with composition.
+
+    Returns (updated, deleted, unchanged). Runs in one BEGIN IMMEDIATE transaction, so
+    readers see either the previous or the refreshed table.
+    """
+    chains = chains or load_fallback_chains()
+    signature = chains_signature(chains)
+    create_resolved_table_if_not_exists(conn)
+    conn.commit()
+
+    columns = ', '.join(f'"{lang}"' for lang in LANGUAGE_COLUMNS)
+    upsert_sql = f'''
+        INSERT OR REPLACE INTO "{RESOLVED_TABLE}" (material, {columns}, fallbackMask, sourceHash, refreshedAt)
+        VALUES ({', '.join('?' for _ in range(len(LANGUAGE_COLUMNS) + 3))}, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    '''
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if full:
+            conn.execute(f'DELETE FROM "{RESOLVED_TABLE}"')
+        existing = dict(conn.execute(f'SELECT material, sourceHash FROM "{RESOLVED_TABLE}"'))
+
+        source = conn.execute(f'''
+            SELECT material, {columns} FROM composition
+            WHERE material IS NOT NULL AND trim(material) != ''
+            ORDER BY material, rowid
+        ''')
+        updated = 0
+        unchanged = 0
+        batch = []
+        for material, rows in groupby(source, key=lambda row: row[0]):
+            cells = merge_source_rows(row[1:] for row in rows)
+            digest = source_hash(signature, material, cells)
+            if existing.pop(material, None) == digest:
+                unchanged += 1
+                continue
+            values, mask = resolve_cells(material, cells, chains)
+            batch.append([material] + values + [mask, digest])
+            if len(batch) >= batch_size:
+                conn.executemany(upsert_sql, batch)
+                updated += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(upsert_sql, batch)
+            updated += len(batch)
+
+        # Whatever is left in `existing` no longer has a source row
+        conn.executemany(f'DELETE FROM "{RESOLVED_TABLE}" WHERE material = ?',
+                         [(material,) for material in existing])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return updated, len(existing), unchanged
+
+
+def ensure_resolved_translations(conn):
+    """Refresh composition_resolved if it is missing materials; returns True when refreshed.
+
+    Readers call this instead of refreshing unconditionally. The table is normally kept
+    current by the Excel import and the `refresh` command, so a read only takes the write
+    lock when the table doesn't exist yet, is still empty (e.g. freshly created by the
+    Prisma migration), or lacks a material that composition has.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (RESOLVED_TABLE,)).fetchone()
+    if exists:
+        missing = conn.execute(f'''
+            SELECT 1 FROM composition c
+            WHERE c.material IS NOT NULL AND trim(c.material) != ''
+              AND NOT EXISTS (SELECT 1 FROM "{RESOLVED_TABLE}" r WHERE r.material = c.material)
+            LIMIT 1
+        ''').fetchone()
+        if not missing:
+            return False
+    refresh_resolved_translations(conn)
+    return True
+
+
+def get_resolved_translations(conn, materials):
+    """Resolved values per material: {material: (values in LANGUAGE_COLUMNS order, fallbackMask)}"""
+    columns = ', '.join(f'"{lang}"' for lang in LANGUAGE_COLUMNS)
+    result = {}
+    for material in materials:
+        row = conn.execute(f'SELECT {columns}, fallbackMask FROM "{RESOLVED_TABLE}" WHERE material = ?',
+                           (material,)).fetchone()
+        if row is not None:
+            result[material] = (list(row[:-1]), row[-1])
+    return result
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Fallback-resolved composition translations')
+    parser.add_argument('command', choices=['refresh', 'show'])
+    parser.add_argument('materials', nargs='*', help='Materials to show')
+    parser.add_argument('--db', help='SQLite database path (default: prisma/dev.db)')
+    parser.add_argument('--chains', help=f'Fallback chain config (default: {FALLBACK_CONFIG_NAME} if present)')
+    parser.add_argument('--full', action='store_true', help='Rebuild every row instead of only changed ones')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    db_path = args.db or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        if args.command == 'refresh':
+            chains = load_fallback_chains(args.chains)
+            print("🔄 Refreshing resolved translations...")
+            updated, deleted, unchanged = refresh_resolved_translations(conn, chains, args.full)
+            flagged = conn.execute(f'SELECT COUNT(*) FROM "{RESOLVED_TABLE}" WHERE fallbackMask != 0').fetchone()[0]
+            print(f"✅ {updated} updated, {deleted} removed, {unchanged} unchanged "
+                  f"({flagged} materials use fallback values)")
+        else:
+            resolved = get_resolved_translations(conn, args.materials)
+            for material in args.materials:
+                if material not in resolved:
+                    print(f"❌ NOT FOUND: {material}")
+                    continue
+                values, mask = resolved[material]
+                print(f"\n🔍 {material}:")
+                for lang, value in zip(LANGUAGE_COLUMNS, values):
+                    marker = '  (fallback)' if lang in fallback_languages(mask) else ''
+                    print(f"    {lang}: {value}{marker}")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ {args.command} failed: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
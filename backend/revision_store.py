@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Content-addressed revision store for master file documents
+Splits each revision into per-object records hashed by content, so the object lists
+shared between revisions are stored once. A revision is a small skeleton (the document
+with its object lists cut out) plus a list of object references, stored as a delta
+against the previous revision with a full reference list every KEYFRAME_INTERVAL
+revisions to keep reassembly fast.
+
+Usage:
+    py revision_store.py import <master_file_id> <file.json> [<file.json> ...]
+    py revision_store.py snapshot            # store current master_files.data as revisions
+    py revision_store.py export <master_file_id> <revision> [output.json]
+    py revision_store.py stats
+"""
+
+import sqlite3
+import os
+import sys
+import json
+import hashlib
+import difflib
+import re
+from datetime import datetime
+
+# Lists under this key are split into per-object records, at any depth
+# (e.g. "objects" in Illustrator exports, "designData.objects" in MasterFile.data)
+OBJECT_LIST_KEY = 'objects'
+REFS_PLACEHOLDER = '$refs'
+
+# Every Nth revision stores its full reference list instead of a delta
+KEYFRAME_INTERVAL = 16
+
+# Delta segment kinds: [COPY, start, end] copies base refs[start:end], [ADD, [hashes]] adds new refs
+COPY = 0
+ADD = 1
+
+
+def get_db_path():
+    """Path to the backend SQLite database"""
+    return os.path.join(os.path.dirname(__file__), 'prisma', 'dev.db')
+
+
+def connect_to_database(db_path=None):
+    """Connect to the SQLite database"""
+    db_path = db_path or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at: {db_path}")
+        return None
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def create_tables_if_not_exist(conn):
+    """Create the revision store tables (backup in case the Prisma migration hasn't run)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS "revision_objects" (
+            "hash" TEXT NOT NULL PRIMARY KEY,
+            "body" TEXT NOT NULL,
+            "size" INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS "master_file_revisions" (
+            "masterFileId" TEXT NOT NULL,
+            "revision" INTEGER NOT NULL,
+            "contentHash" TEXT NOT NULL,
+            "skeletonHash" TEXT NOT NULL,
+            "baseRevision" INTEGER,
+            "refs" TEXT NOT NULL,
+            "objectCount" INTEGER NOT NULL,
+            "rawSize" INTEGER NOT NULL,
+            "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+            PRIMARY KEY ("masterFileId", "revision")
+        )
+    ''')
+    conn.commit()
+
+
+def serialize(value):
+    """Compact JSON used for hashing and storage (key order preserved)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def split_document(document):
+    """Cut object lists out of a document.
+
+    Returns (skeleton, object_lists): each object list is replaced in the skeleton by
+    {"$refs": n}, where n indexes object_lists.
+    """
+    object_lists = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            result = {}
+            for key, value in node.items():
+                if key == OBJECT_LIST_KEY and isinstance(value, list):
+                    result[key] = {REFS_PLACEHOLDER: len(object_lists)}
+                    object_lists.append(value)
+                else:
+                    result[key] = walk(value)
+            return result
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    return walk(document), object_lists
+
+
+def join_document(skeleton, object_lists):
+    """Inverse of split_document"""
+    def walk(node):
+        if isinstance(node, dict):
+            if len(node) == 1 and REFS_PLACEHOLDER in node:
+                return object_lists[node[REFS_PLACEHOLDER]]
+            return {key: walk(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    return walk(skeleton)
+
+
+def encode_delta(base_refs, refs):
+    """Encode refs as COPY/ADD segments against base_refs"""
+    segments = []
+    matcher = difflib.SequenceMatcher(a=base_refs, b=refs, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            segments.append([COPY, i1, i2])
+        elif j2 > j1:
+            segments.append([ADD, refs[j1:j2]])
+    return segments
+
+
+def apply_delta(base_refs, segments):
+    refs = []
+    for segment in segments:
+        if segment[0] == COPY:
+            refs.extend(base_refs[segment[1]:segment[2]])
+        else:
+            refs.extend(segment[1])
+    return refs
+
+
+class RevisionStore:
+    """Deduplicating store for master file document revisions"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        create_tables_if_not_exist(conn)
+        # (masterFileId, revision) -> flat reference list; revisions are immutable
+        self._refs_cache = {}
+        self._object_cache = {}
+
+    def latest_revision(self, master_file_id):
+        """(revision, contentHash) of the newest revision, or (0, None)"""
+        row = self.conn.execute('''
+            SELECT revision, contentHash FROM master_file_revisions
+            WHERE masterFileId = ? ORDER BY revision DESC LIMIT 1
+        ''', (master_file_id,)).fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def _put_object(self, body):
+        digest = hash_text(body)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO revision_objects (hash, body, size) VALUES (?, ?, ?)",
+            (digest, body, len(body.encode('utf-8')))
+        )
+        return digest, cursor.rowcount > 0
+
+    def save_revision(self, master_file_id, document):
+        """Store a document as the next revision; unchanged documents are not stored again.
+
+        Returns (revision, created, new_record_count).
+        """
+        if isinstance(document, str):
+            document = json.loads(document)
+
+        raw = serialize(document)
+        content_hash = hash_text(raw)
+        latest, latest_hash = self.latest_revision(master_file_id)
+        if latest_hash == content_hash:
+            return latest, False, 0
+
+        skeleton, object_lists = split_document(document)
+        new_objects = 0
+
+        skeleton_hash, created = self._put_object(serialize(skeleton))
+        new_objects += int(created)
+
+        # One flat reference list for all object lists (their lengths are kept in
+        # counts), so a single delta covers every list in the document
+        refs = []
+        counts = []
+        for object_list in object_lists:
+            counts.append(len(object_list))
+            for obj in object_list:
+                digest, created = self._put_object(serialize(obj))
+                refs.append(digest)
+                new_objects += int(created)
+
+        revision = latest + 1
+        if latest == 0 or revision % KEYFRAME_INTERVAL == 1:
+            # Keyframe lists are content-addressed too, so master files that share
+            # the same objects also share the (comparatively large) list itself
+            base_revision = None
+            list_hash, created = self._put_object(serialize(refs))
+            new_objects += int(created)
+            stored_refs = {'counts': counts, 'list': list_hash}
+        else:
+            base_revision = latest
+            stored_refs = {'counts': counts, 'delta': encode_delta(self._load_refs(master_file_id, latest), refs)}
+
+        self.conn.execute('''
+            INSERT INTO master_file_revisions
+                (masterFileId, revision, contentHash, skeletonHash, baseRevision, refs, objectCount, rawSize, createdAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (master_file_id, revision, content_hash, skeleton_hash, base_revision,
+              serialize(stored_refs), len(refs), len(raw.encode('utf-8')), datetime.now().isoformat()))
+        self.conn.commit()
+
+        self._refs_cache[(master_file_id, revision)] = refs
+        return revision, True, new_objects
+
+    def _load_row(self, master_file_id, revision):
+        row = self.conn.execute('''
+            SELECT skeletonHash, baseRevision, refs FROM master_file_revisions
+            WHERE masterFileId = ? AND revision = ?
+        ''', (master_file_id, revision)).fetchone()
+        if row is None:
+            raise LookupError(f"Revision {revision} of master file {master_file_id} not found")
+        return row[0], row[1], json.loads(row[2])
+
+    def _load_refs(self, master_file_id, revision):
+        """Resolve the flat reference list of a revision (walks back to the keyframe)"""
+        key = (master_file_id, revision)
+        if key in self._refs_cache:
+            return self._refs_cache[key]
+
+        # Collect the delta chain iteratively, then apply it forwards
+        chain = []
+        current = revision
+        while True:
+            if (master_file_id, current) in self._refs_cache:
+                refs = self._refs_cache[(master_file_id, current)]
+                break
+            _, base_revision, stored = self._load_row(master_file_id, current)
+            if base_revision is None:
+                refs = self._load_objects([stored['list']])[0]
+                self._refs_cache[(master_file_id, current)] = refs
+                break
+            chain.append((current, stored['delta']))
+            current = base_revision
+
+        for chain_revision, delta in reversed(chain):
+            refs = apply_delta(refs, delta)
+            self._refs_cache[(master_file_id, chain_revision)] = refs
+        return refs
+
+    def _load_objects(self, hashes):
+        missing = [h for h in set(hashes) if h not in self._object_cache]
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            for digest, body in self.conn.execute(
+                    f"SELECT hash, body FROM revision_objects WHERE hash IN ({placeholders})", chunk):
+                self._object_cache[digest] = json.loads(body)
+        return [self._object_cache[h] for h in hashes]
+
+    def load_revision(self, master_file_id, revision=None):
+        """Reassemble a revision (latest when revision is None)"""
+        if revision is None:
+            revision = self.latest_revision(master_file_id)[0]
+        skeleton_hash, _, stored = self._load_row(master_file_id, revision)
+        refs = self._load_refs(master_file_id, revision)
+
+        skeleton = self._load_objects([skeleton_hash])[0]
+        objects = self._load_objects(refs)
+        object_lists = []
+        offset = 0
+        for count in stored['counts']:
+            object_lists.append(objects[offset:offset + count])
+            offset += count
+        return join_document(skeleton, object_lists)
+
+
+def natural_sort_key(path):
+    """f2.json before f10.json"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', os.path.basename(path))]
+
+
+def import_files(store, master_file_id, file_paths):
+    """Store a series of JSON files as consecutive revisions"""
+    for file_path in sorted(file_paths, key=natural_sort_key):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {file_path}: {e}")
+            continue
+        revision, created, new_objects = store.save_revision(master_file_id, document)
+        if created:
+            print(f"📝 {os.path.basename(file_path)} → revision {revision} ({new_objects} new records)")
+        else:
+            print(f"⏭️ {os.path.basename(file_path)} unchanged (revision {revision})")
+
+
+def snapshot_master_files(store, conn):
+    """Store the current data of every master file as a revision (if it changed)"""
+    from master_file_store import MasterFileStore
+
+    master_files = MasterFileStore(conn)
+    stored = 0
+    for meta in master_files.list_master_files():
+        data = master_files.get_data(meta['id'])
+        if not data:
+            continue
+        try:
+            revision, created, new_objects = store.save_revision(meta['id'], data)
+        except ValueError as e:
+            print(f"⚠️ Skipping {meta['name']}: invalid JSON ({e})")
+            continue
+        if created:
+            stored += 1
+            print(f"📝 {meta['name']} → revision {revision} ({new_objects} new records)")
+    return stored
+
+
+def print_stats(conn):
+    """Compare logical revision size against what is actually stored"""
+    revisions, raw_size = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(rawSize), 0) FROM master_file_revisions").fetchone()
+    objects, object_size = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM revision_objects").fetchone()
+    refs_size = conn.execute(
+        "SELECT COALESCE(SUM(length(refs)), 0) FROM master_file_revisions").fetchone()[0]
+    stored = object_size + refs_size
+
+    print(f"📊 REVISION STORE:")
+    print(f"  Revisions: {revisions} ({raw_size} bytes as full copies)")
+    print(f"  Unique records: {objects} ({object_size} bytes)")
+    print(f"  Reference lists: {refs_size} bytes")
+    if raw_size:
+        print(f"  Stored: {stored} bytes ({stored / raw_size:.1%} of full copies)")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ('import', 'snapshot', 'export', 'stats'):
+        print(__doc__)
+        return
+
+    conn = connect_to_database()
+    if conn is None:
+        return
+
+    try:
+        store = RevisionStore(conn)
+        command = argv[0]
+
+        if command == 'import' and len(argv) >= 3:
+            import_files(store, argv[1], argv[2:])
+        elif command == 'snapshot':
+            stored = snapshot_master_files(store, conn)
+            print(f"✅ {stored} master files had new revisions")
+        elif command == 'export' and len(argv) >= 3:
+            document = store.load_revision(argv[1], int(argv[2]))
+            if len(argv) > 3:
+                with open(argv[3], 'w', encoding='utf-8') as f:
+                    json.dump(document, f, ensure_ascii=False, indent=2)
+                print(f"✅ Revision {argv[2]} written to {argv[3]}")
+            else:
+                print(json.dumps(document, ensure_ascii=False, indent=2))
+        elif command != 'stats':
+            print(__doc__)
+            return
+
+        print_stats(conn)
+    except Exception as e:
+        print(f"❌ Revision store error: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import express from 'express';
 import { z } from 'zod';
 import { prisma } from '../index';
 import { authenticateToken, requireOwnership } from '../middleware/auth';
+import { hydrateMasterFile, masterFileMetadataSelect } from '../utils/masterFileBlobs';
 
 const router = express.Router();
 
@@ -18,10 +19,11 @@ const masterFileSchema = z.object({
   canvasImage: z.string().optional(), // SVG image data
 });
 
-// GET /api/master-files - Get all master files
+// GET /api/master-files - Get all master files (metadata only; payloads via /:id)
 router.get('/', async (req, res) => {
   try {
     const masterFiles = await prisma.masterFile.findMany({
+      select: masterFileMetadataSelect,
       orderBy: { updatedAt: 'desc' }
     });
 
@@ -32,6 +34,28 @@ router.get('/', async (req, res) => {
   }
 });
 
+// GET /api/master-files/:id/thumbnail - Get only the canvas image of a master file
+router.get('/:id/thumbnail', async (req, res) => {
+  try {
+    const { id } = req.params;
+
+    const masterFile = await prisma.masterFile.findUnique({
+      where: { id },
+      select: { id: true, canvasImage: true }
+    });
+
+    if (!masterFile) {
+      return res.status(404).json({ error: 'Master file not found' });
+    }
+
+    const { canvasImage } = await hydrateMasterFile(masterFile);
+    return res.json({ id, canvasImage });
+  } catch (error) {
+    console.error('Get master file thumbnail error:', error);
+    return res.status(500).json({ error: 'Failed to get master file thumbnail' });
+  }
+});
+
 // GET /api/master-files/:id - Get specific master file
 router.get('/:id', async (req, res) => {
   try {
@@ -45,7 +69,7 @@ router.get('/:id', async (req, res) => {
       return res.status(404).json({ error: 'Master file not found' });
     }
 
-    return res.json({ masterFile });
+    return res.json({ masterFile: await hydrateMasterFile(masterFile) });
   } catch (error) {
     console.error('Get master file error:', error);
     return res.status(500).json({ error: 'Failed to get master file' });
@@ -104,7 +128,7 @@ router.put('/:id', async (req, res) => {
 
     return res.json({
       message: 'Master file updated successfully',
-      masterFile
+      masterFile: await hydrateMasterFile(masterFile)
     });
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -2,6 +2,7 @@ import express from 'express';
 import { z } from 'zod';
 import { prisma } from '../index';
 import { authenticateToken } from '../middleware/auth';
+import { hydrateMasterFile } from '../utils/masterFileBlobs';
 
 const router = express.Router();
 
@@ -79,7 +80,7 @@ router.get('/:id', async (req, res) => {
       return res.status(403).json({ error: 'Access denied' });
     }
 
-    res.json({ order });
+    res.json({ order: { ...order, masterFile: await hydrateMasterFile(order.masterFile) } });
   } catch (error) {
     console.error('Get order error:', error);
     res.status(500).json({ error: 'Failed to get order' });
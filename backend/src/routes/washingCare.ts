@@ -5,6 +5,13 @@ import ExcelJS from 'exceljs';
 const router = Router();
 const prisma = new PrismaClient();
 
+// Column order of composition_resolved.fallbackMask bits (LANGUAGE_COLUMNS in the Python tools)
+const RESOLVED_LANGUAGES = [
+  'spanish', 'french', 'english', 'portuguese', 'dutch', 'italian',
+  'greek', 'japanese', 'german', 'danish', 'slovenian', 'chinese',
+  'korean', 'indonesian', 'arabic', 'galician', 'catalan', 'basque'
+];
+
 // Get all shortform records
 router.get('/shortform', async (req, res) => {
   try {
@@ -223,6 +230,35 @@ router.get('/composition/materials/unique', async (req, res) => {
   }
 });
 
+// Get fallback-resolved translations for one material
+router.get('/composition/resolved/:material', async (req, res) => {
+  try {
+    const { material } = req.params;
+    const resolved = await prisma.compositionResolved.findUnique({
+      where: { material }
+    });
+    
+    if (!resolved) {
+      return res.status(404).json({
+        success: false,
+        error: 'Material not found'
+      });
+    }
+    
+    res.json({
+      success: true,
+      data: resolved,
+      fallbackLanguages: RESOLVED_LANGUAGES.filter((_, i) => resolved.fallbackMask & (1 << i))
+    });
+  } catch (error) {
+    console.error('Error fetching resolved translations:', error);
+    res.status(500).json({
+      success: false,
+      error: 'Failed to fetch resolved translations'
+    });
+  }
+});
+
 // Get database statistics
 router.get('/stats', async (req, res) => {
   try {
@@ -0,0 +1,52 @@
+import zlib from 'zlib';
+import { prisma } from '../index';
+
+// Large data/canvasImage payloads may have been moved to master_file_blobs by
+// master_file_store.py, leaving "@@blob:<sha256>" in the column
+const BLOB_REF_PREFIX = '@@blob:';
+
+type BlobField = 'data' | 'canvasImage';
+
+// Columns safe to list: everything except the (possibly blob-backed) payloads
+export const masterFileMetadataSelect = {
+  id: true,
+  name: true,
+  description: true,
+  width: true,
+  height: true,
+  createdAt: true,
+  updatedAt: true,
+  userId: true
+};
+
+const isBlobRef = (value: string | null | undefined): value is string =>
+  typeof value === 'string' && value.startsWith(BLOB_REF_PREFIX);
+
+const loadBlobPayload = async (masterFileId: string, field: BlobField, ref: string): Promise<string> => {
+  const blob = await prisma.masterFileBlob.findUnique({
+    where: { masterFileId_field: { masterFileId, field } }
+  });
+  if (!blob || blob.contentHash !== ref.slice(BLOB_REF_PREFIX.length)) {
+    throw new Error(`Missing ${field} blob for master file ${masterFileId}`);
+  }
+  if (blob.codec !== 'zlib') {
+    throw new Error(`Unsupported master file blob codec: ${blob.codec}`);
+  }
+  return zlib.inflateSync(blob.payload).toString('utf-8');
+};
+
+// Replace blob references in a single master file with the inflated payloads.
+// Only the fields present on the object are resolved, so callers selecting just
+// canvasImage never inflate data.
+export const hydrateMasterFile = async <T extends { id: string; data?: string; canvasImage?: string | null }>(
+  masterFile: T
+): Promise<T> => {
+  const hydrated: T = { ...masterFile };
+  if (isBlobRef(masterFile.data)) {
+    Object.assign(hydrated, { data: await loadBlobPayload(masterFile.id, 'data', masterFile.data) });
+  }
+  if (isBlobRef(masterFile.canvasImage)) {
+    Object.assign(hydrated, { canvasImage: await loadBlobPayload(masterFile.id, 'canvasImage', masterFile.canvasImage) });
+  }
+  return hydrated;
+};
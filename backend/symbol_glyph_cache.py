@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Care-symbol glyph outline cache
+Extracts each symbol glyph from Wash_Care_Symbols_M54.ttf once into normalized SVG
+path + bounding box records on disk, keyed by symbol code (see font/font.xlsx).
+GlyphCache loads records lazily with LRU eviction so batch label rendering can paste
+precomputed paths instead of shaping the font per label.
+"""
+
+import os
+import sys
+import json
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+
+# Bump when the record format changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+INDEX_NAME = 'index.json'
+
+
+def get_default_paths():
+    """Default font, symbol mapping and cache locations"""
+    repo_root = os.path.join(os.path.dirname(__file__), '..')
+    font_path = os.path.join(repo_root, 'font', 'Wash_Care_Symbols_M54.ttf')
+    mapping_path = os.path.join(repo_root, 'font', 'font.xlsx')
+    cache_dir = os.path.join(os.path.dirname(__file__), 'cache', 'symbol_glyphs')
+    return font_path, mapping_path, cache_dir
+
+
+def file_hash(file_path):
+    """SHA-256 of a file, used to detect font changes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def record_file_name(code):
+    """Cache file name for a symbol code (by code point, so 'b' and 'B' never clash on Windows)"""
+    return '_'.join(f"U+{ord(ch):04X}" for ch in code) + '.json'
+
+
+def format_number(value):
+    """Compact number formatting for SVG paths"""
+    text = f"{value:.4f}".rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def read_symbol_mapping(mapping_path):
+    """Read symbol code -> {type, details} from font.xlsx"""
+    import pandas as pd
+
+    df = pd.read_excel(mapping_path)
+    symbols = {}
+    for _, row in df.iterrows():
+        code = row.get('symbol')
+        if pd.isna(code):
+            continue
+        if isinstance(code, float) and code.is_integer():
+            code = int(code)
+        code = str(code)
+        symbols[code] = {
+            'type': '' if pd.isna(row.get('type')) else str(row.get('type')),
+            'details': '' if pd.isna(row.get('details')) else str(row.get('details'))
+        }
+    return symbols
+
+
+def extract_glyph_records(font_path, symbols):
+    """Extract normalized outline records for the given symbol codes"""
+    from fontTools.ttLib import TTFont
+    from fontTools.pens.svgPathPen import SVGPathPen
+    from fontTools.pens.transformPen import TransformPen
+    from fontTools.pens.boundsPen import BoundsPen
+
+    font = TTFont(font_path)
+    units_per_em = font['head'].unitsPerEm
+    ascender = font['hhea'].ascent
+    cmap = font.getBestCmap()
+    glyph_set = font.getGlyphSet()
+
+    # Normalize to 1 em = 1.0, y axis pointing down, y = 0 at the ascender line
+    scale = 1.0 / units_per_em
+    transform = (scale, 0, 0, -scale, 0, ascender * scale)
+
+    records = {}
+    missing = []
+    for code, meta in symbols.items():
+        if len(code) != 1 or ord(code) not in cmap:
+            missing.append(code)
+            continue
+
+        glyph_name = cmap[ord(code)]
+        glyph = glyph_set[glyph_name]
+
+        path_pen = SVGPathPen(glyph_set, ntos=format_number)
+        glyph.draw(TransformPen(path_pen, transform))
+
+        bounds_pen = BoundsPen(glyph_set)
+        glyph.draw(bounds_pen)
+        bbox = None
+        if bounds_pen.bounds:
+            x_min, y_min, x_max, y_max = bounds_pen.bounds
+            bbox = [
+                round(x_min * scale, 4),
+                round((ascender - y_max) * scale, 4),
+                round(x_max * scale, 4),
+                round((ascender - y_min) * scale, 4)
+            ]
+
+        records[code] = {
+            'code': code,
+            'glyph': glyph_name,
+            'type': meta.get('type', ''),
+            'details': meta.get('details', ''),
+            'advance': round(glyph.width * scale, 4),
+            'bbox': bbox,
+            'path': path_pen.getCommands()
+        }
+
+    return records, missing, units_per_em, ascender
+
+
+def build_glyph_cache(font_path, mapping_path, cache_dir, force=False):
+    """Build the on-disk cache; skipped when the font and format are unchanged"""
+    if not os.path.exists(font_path):
+        print(f"❌ Font file not found: {font_path}")
+        return False
+    if not os.path.exists(mapping_path):
+        print(f"❌ Symbol mapping not found: {mapping_path}")
+        return False
+
+    font_digest = file_hash(font_path)
+    mapping_digest = file_hash(mapping_path)
+    index_path = os.path.join(cache_dir, INDEX_NAME)
+
+    if not force and os.path.exists(index_path):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if (index.get('version') == CACHE_FORMAT_VERSION and
+                    index.get('fontHash') == font_digest and
+                    index.get('mappingHash') == mapping_digest):
+                print(f"✅ Glyph cache up to date ({len(index.get('symbols', {}))} symbols)")
+                return True
+        except (OSError, ValueError):
+            pass
+
+    try:
+        symbols = read_symbol_mapping(mapping_path)
+        records, missing, units_per_em, ascender = extract_glyph_records(font_path, symbols)
+    except Exception as e:
+        print(f"❌ Failed to extract glyphs: {e}")
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index_symbols = {}
+    for code, record in records.items():
+        file_name = record_file_name(code)
+        with open(os.path.join(cache_dir, file_name), 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
+        index_symbols[code] = {
+            'file': file_name,
+            'type': record['type'],
+            'details': record['details']
+        }
+
+    index = {
+        'version': CACHE_FORMAT_VERSION,
+        'generatedAt': datetime.now().isoformat(),
+        'font': os.path.basename(font_path),
+        'fontHash': font_digest,
+        'mappingHash': mapping_digest,
+        'unitsPerEm': units_per_em,
+        'ascender': ascender,
+        'symbols': index_symbols
+    }
+    # Write the index last so a partially built cache is never considered valid
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_path)
+
+    print(f"✅ Cached {len(records)} symbol glyphs in {cache_dir}")
+    if missing:
+        print(f"⚠️ Symbols without a glyph in the font: {missing}")
+    return True
+
+
+class GlyphCache:
+    """Lazy, LRU-bounded reader for the on-disk glyph cache"""
+
+    def __init__(self, cache_dir=None, max_entries=64):
+        if cache_dir is None:
+            cache_dir = get_default_paths()[2]
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._index = None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self):
+        if self._index is None:
+            with open(os.path.join(self.cache_dir, INDEX_NAME), 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        return self._index
+
+    def codes(self):
+        """All cached symbol codes"""
+        return list(self._load_index()['symbols'].keys())
+
+    def get(self, code):
+        """Return the glyph record for a symbol code, or None if it is not cached"""
+        record = self._entries.get(code)
+        if record is not None:
+            self._entries.move_to_end(code)
+            self.hits += 1
+            return record
+
+        self.misses += 1
+        entry = self._load_index()['symbols'].get(code)
+        if entry is None:
+            return None
+
+        with open(os.path.join(self.cache_dir, entry['file']), 'r', encoding='utf-8') as f:
+            record = json.load(f)
+
+        self._entries[code] = record
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return record
+
+    def svg_path(self, code, x=0.0, y=0.0, size=1.0):
+        """SVG <path> element for a symbol placed at (x, y) with the given em size"""
+        record = self.get(code)
+        if record is None:
+            return None
+        return (f'<path transform="translate({format_number(x)} {format_number(y)}) '
+                f'scale({format_number(size)})" d="{record["path"]}"/>')
+
+    def clear(self):
+        """Drop all in-memory entries (the on-disk cache is kept)"""
+        self._entries.clear()
+        self._index = None
+
+
+if __name__ == "__main__":
+    print("🔣 Building care-symbol glyph cache...")
+    print("=" * 60)
+
+    font_path, mapping_path, cache_dir = get_default_paths()
+    force = '--force' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    if len(args) > 0:
+        cache_dir = args[0]
+
+    print(f"📁 Font: {os.path.abspath(font_path)}")
+    print(f"📁 Cache folder: {os.path.abspath(cache_dir)}")
+
+    build_glyph_cache(font_path, mapping_path, cache_dir, force=force)